@@ -0,0 +1,159 @@
+#! /usr/bin/env python3
+"""Checks the coalescing and job queue primitives under concurrency.
+
+The job queue checks run against the configured database. Point
+HIEVENTS_CONFIG to a configuration with a scratch database, e.g.
+
+    [db]
+    pool = true
+    backend = sqlite
+    database = /tmp/hievents-check.sqlite3
+
+Use --single-flight to only check the in-process coalescing.
+"""
+
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from sys import exit  # pylint: disable=W0622
+from threading import Barrier
+from time import sleep
+
+from hievents.singleflight import SingleFlight
+
+
+THREADS = 16
+JOBS = 50
+
+
+def get_args():
+    """Parses the command line arguments."""
+
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("-t", "--threads", type=int, default=THREADS)
+    parser.add_argument("-j", "--jobs", type=int, default=JOBS)
+    parser.add_argument(
+        "--single-flight", action="store_true", help="skip the job queue checks"
+    )
+    return parser.parse_args()
+
+
+def check(condition, message):
+    """Exits with the message unless the condition holds."""
+
+    if not condition:
+        print(f"FAILED: {message}")
+        exit(1)
+
+    print(f"ok: {message}")
+
+
+def check_single_flight(threads):
+    """Checks that concurrent calls share one computation."""
+
+    flights = SingleFlight()
+    barrier = Barrier(threads)
+    calls = []
+
+    def compute():
+        calls.append(None)
+        sleep(0.2)
+        return len(calls)
+
+    def call(function):
+        barrier.wait()
+        return flights.do("key", function)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(call, [compute] * threads))
+
+    check(len(calls) == 1, "concurrent calls run the function once")
+    check(set(results) == {1}, "all callers get the leader's result")
+    check(not flights.calls, "finished calls are not retained")
+
+    def fail():
+        sleep(0.2)
+        raise ValueError("expected")
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(call, fail) for _ in range(threads)]
+
+    errors = [future.exception() for future in futures]
+    check(
+        all(isinstance(error, ValueError) for error in errors),
+        "all callers get the leader's exception",
+    )
+    check(flights.do("key", lambda: 42) == 42, "failed keys can be retried")
+
+
+def check_job_queue(threads, jobs):
+    """Checks deduplication and exclusive claiming of jobs."""
+
+    # pylint: disable=C0415
+    from hievents.orm import DATABASE, Job, JobState
+
+    with DATABASE.connection_context():
+        Job.create_table(fail_silently=True)
+        Job.delete().execute()
+
+    def enqueue(_):
+        with DATABASE.connection_context():
+            return Job.enqueue("check", key="check:dedupe").id
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        idents = set(executor.map(enqueue, range(threads)))
+
+    check(len(idents) == 1, "pending jobs are deduplicated by key")
+
+    with DATABASE.connection_context():
+        for index in range(jobs - 1):
+            Job.enqueue("check", key=f"check:{index}")
+
+    def claim(_):
+        claimed = []
+
+        with DATABASE.connection_context():
+            while (job := Job.claim()) is not None:
+                claimed.append(job.id)
+
+        return claimed
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        claimed = [
+            ident for idents in executor.map(claim, range(threads)) for ident in idents
+        ]
+
+    check(len(claimed) == jobs, "every job is claimed")
+    check(len(set(claimed)) == len(claimed), "no job is claimed twice")
+
+    with DATABASE.connection_context():
+        job = Job.get_by_id(claimed[0])
+        job.attempts = job.max_attempts
+        job.save()
+        Job.update(started=job.started - timedelta(hours=1)).where(
+            Job.state == JobState.RUNNING
+        ).execute()
+        Job.requeue_stale(timedelta(minutes=30))
+        check(
+            Job.get_by_id(job.id).state == JobState.FAILED,
+            "stale jobs without attempts left fail",
+        )
+        check(
+            Job.select().where(Job.state == JobState.PENDING).count() == jobs - 1,
+            "other stale jobs are requeued",
+        )
+        Job.delete().execute()
+
+
+def main():
+    """Runs the checks."""
+
+    args = get_args()
+    check_single_flight(args.threads)
+
+    if not args.single_flight:
+        check_job_queue(args.threads, args.jobs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#! /usr/bin/env python3
+"""Benchmarks the JSON encoders on a large event listing.
+
+The listing mixes model serializations with raw Decimal, date, Enum
+and UUID values. Verifies that hievents.encoding.dumps() and FastJSON
+output is byte-identical to the current wire format of wsgilib.JSON.
+orjson, if installed, is timed for reference only: its compact,
+non-ASCII-escaped output differs, so the endpoints do not use it.
+"""
+
+from argparse import ArgumentParser
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from sys import exit  # pylint: disable=W0622
+from timeit import repeat
+from uuid import uuid4
+
+from wsgilib import JSON
+
+from hievents.encoding import dumps
+from hievents.orm import Currency, Price, PriceSummary, SubEvent
+from hievents.wsgi.responses import FastJSON
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+EVENTS = 10_000
+RUNS = 5
+
+
+def get_args():
+    """Parses the command line arguments."""
+
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("-e", "--events", type=int, default=EVENTS)
+    parser.add_argument("-n", "--runs", type=int, default=RUNS)
+    return parser.parse_args()
+
+
+def make_listing(events):
+    """Returns a listing resembling serialized events.
+
+    Relations are serialized by the models, unsaved
+    to run without database access.
+    """
+
+    now = datetime.now()
+    prices = [
+        Price(
+            event=1, value=Decimal("12.50"), currency=Currency.EUR, caption="Adult"
+        ),
+        Price(event=1, value=Decimal("9.99"), currency=Currency.CHF),
+    ]
+    price_summary = PriceSummary(
+        event=1,
+        currency=Currency.EUR,
+        minimum=Decimal("9.99"),
+        maximum=Decimal("12.50"),
+    )
+    return [
+        {
+            "id": ident,
+            "title": f"Event №{ident}",
+            "subtitle": "Open air",
+            "created": now - timedelta(days=ident),
+            "begin": date.today(),
+            "token": uuid4(),
+            "distance": Decimal("1.25"),
+            "currency": Currency.DKK,
+            "prices": [price.to_json() for price in prices],
+            "price_summaries": [price_summary.to_json()],
+            "sub_events": [
+                SubEvent(
+                    event=1, timestamp=now + timedelta(hours=hour), caption="Concert"
+                ).to_json()
+                for hour in range(3)
+            ],
+        }
+        for ident in range(events)
+    ]
+
+
+def best_of(function, listing, runs):
+    """Returns the best time of the encoder in seconds."""
+
+    return min(repeat(lambda: function(listing), number=1, repeat=runs))
+
+
+def main():
+    """Runs the benchmark."""
+
+    args = get_args()
+    listing = make_listing(args.events)
+    baseline = JSON(listing).get_data()
+
+    for name, data in (
+        ("hievents.encoding.dumps()", dumps(listing)),
+        ("FastJSON", FastJSON(listing).get_data()),
+    ):
+        if data != baseline:
+            print(f"{name} output differs from wsgilib.JSON.")
+            exit(1)
+
+    print(f"Output is byte-identical to wsgilib.JSON ({len(baseline)} bytes).")
+    encoders = {"wsgilib.JSON": lambda obj: JSON(obj).get_data(), "dumps()": dumps}
+
+    if orjson is not None:
+        encoders["orjson"] = lambda obj: orjson.dumps(obj, default=str)
+
+    print(f"Encoding {args.events} events:")
+
+    for name, function in encoders.items():
+        seconds = best_of(function, listing, args.runs)
+        print(f"{name:>14}: {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+#! /usr/bin/env python3
+"""Simulates a fleet of polling terminals and a few editors.
+
+Terminals poll /pub/event with conditional requests at jittered
+intervals and fetch the images of the listed events. Editors patch
+and create events through /event. The load runs against the
+in-process APPLICATION or a local server and reports latency
+percentiles, throughput and error rates per request kind.
+"""
+
+from argparse import ArgumentParser
+from collections import defaultdict
+from datetime import date
+from heapq import heappop, heappush
+from json import dumps, loads
+from math import ceil
+from queue import Queue
+from random import choice, random, uniform
+from threading import Lock, Thread, local
+from time import perf_counter, sleep
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+
+DURATION = 60
+TERMINALS = 100
+EDITORS = 2
+INTERVAL = 30
+EDIT_INTERVAL = 10
+CONCURRENCY = 16
+POST_RATIO = 0.1
+ERROR_STATUS = 599
+
+
+class InProcessClient:
+    """Sends requests to the in-process WSGI application."""
+
+    def __init__(self):
+        from hievents.wsgi import APPLICATION  # pylint: disable=C0415
+
+        self.application = APPLICATION
+        self.local = local()
+
+    def request(self, method, path, headers, json=None):
+        """Returns status, headers and body of the response."""
+        if (client := getattr(self.local, "client", None)) is None:
+            client = self.local.client = self.application.test_client()
+
+        response = client.open(path, method=method, headers=headers, json=json)
+        return response.status_code, response.headers, response.get_data()
+
+
+class HTTPClient:
+    """Sends requests to a running server."""
+
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+
+    def request(self, method, path, headers, json=None):
+        """Returns status, headers and body of the response."""
+        headers = dict(headers)
+        data = None
+
+        if json is not None:
+            data = dumps(json).encode()
+            headers["Content-Type"] = "application/json"
+
+        request = Request(self.url + path, data=data, headers=headers, method=method)
+
+        try:
+            with urlopen(request) as response:
+                return response.status, response.headers, response.read()
+        except HTTPError as error:
+            return error.code, error.headers, error.read()
+        except OSError as error:  # Connection errors and timeouts.
+            return ERROR_STATUS, {}, str(error).encode()
+
+
+class Statistics:
+    """Thread-safe latency and status statistics per request kind."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, kind, seconds, status):
+        """Records a response."""
+        with self.lock:
+            self.latencies[kind].append(seconds)
+
+            if status >= 400:
+                self.errors[kind] += 1
+
+    def report(self, duration):
+        """Prints the statistics."""
+        print(
+            f"{'kind':<14}{'count':>8}{'req/s':>9}{'p50 ms':>9}"
+            f"{'p95 ms':>9}{'p99 ms':>9}{'errors':>9}"
+        )
+
+        for kind, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            print(
+                f"{kind:<14}{len(latencies):>8}{len(latencies) / duration:>9.1f}"
+                f"{percentile(latencies, 0.5) * 1000:>9.1f}"
+                f"{percentile(latencies, 0.95) * 1000:>9.1f}"
+                f"{percentile(latencies, 0.99) * 1000:>9.1f}"
+                f"{self.errors[kind] / len(latencies):>9.1%}"
+            )
+
+
+def percentile(latencies, fraction):
+    """Returns the percentile of sorted latencies."""
+
+    return latencies[max(ceil(fraction * len(latencies)) - 1, 0)]
+
+
+class Terminal:
+    """A terminal polling its customer's events."""
+
+    def __init__(self, token):
+        self.token = token
+        self.etags = {}
+
+    def _get(self, client, statistics, kind, path):
+        """Performs a conditional GET request."""
+        headers = {}
+
+        if (etag := self.etags.get(path)) is not None:
+            headers["If-None-Match"] = etag
+
+        start = perf_counter()
+        status, response_headers, body = client.request("GET", path, headers)
+        statistics.record(kind, perf_counter() - start, status)
+
+        if status == 200 and (etag := response_headers.get("ETag")):
+            self.etags[path] = etag
+
+        return status, body
+
+    def __call__(self, client, statistics):
+        status, body = self._get(
+            client, statistics, "events", f"/pub/event?access_token={self.token}"
+        )
+
+        if status != 200:
+            return
+
+        for event in loads(body):
+            for image, version in event.get("image_versions", {}).items():
+                path = f"/pub/image/{image}/{version}?access_token={self.token}"
+
+                # Image versions are immutable, so clients fetch them once.
+                if path not in self.etags:
+                    self._get(client, statistics, "images", path)
+
+
+class Editor:
+    """An editor patching and creating events."""
+
+    def __init__(self, headers, events, template):
+        self.headers = headers
+        self.events = events
+        self.template = template
+
+    def __call__(self, client, statistics):
+        if self.template is not None and random() < POST_RATIO:
+            kind, method, path, json = "post_event", "POST", "/event", self.template
+        else:
+            kind, method = "patch_event", "PATCH"
+            path = f"/event/{choice(self.events)}"
+            json = {"subtitle": f"Load test {random():.6f}"}
+
+        start = perf_counter()
+        status, _, _ = client.request(method, path, self.headers, json=json)
+        statistics.record(kind, perf_counter() - start, status)
+
+
+def seed(events, author, address):
+    """Creates events for all customers with an access token
+    and returns their IDs.
+    """
+
+    # pylint: disable=C0415
+    from hievents.orm import DATABASE, AccessToken, Event, EventCustomer
+
+    customers = [token.customer_id for token in AccessToken.select()]
+    idents = []
+
+    with DATABASE.atomic():
+        for index in range(events):
+            event = Event(
+                author=author,
+                address=address,
+                title=f"Load test event #{index}",
+                begin=date.today(),
+            )
+            event.save()
+            customer = customers[index % len(customers)]
+            EventCustomer.create(event=event, customer=customer)
+            idents.append(event.id)
+
+    return idents
+
+
+def get_tokens(args):
+    """Returns the access tokens of the terminals."""
+
+    if args.token:
+        return args.token
+
+    from hievents.orm import AccessToken  # pylint: disable=C0415
+
+    return [str(token.token) for token in AccessToken.select()]
+
+
+def get_args():
+    """Parses the command line arguments."""
+
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="server URL, default: in-process APPLICATION")
+    parser.add_argument("-d", "--duration", type=float, default=DURATION)
+    parser.add_argument("-t", "--terminals", type=int, default=TERMINALS)
+    parser.add_argument("-i", "--interval", type=float, default=INTERVAL)
+    parser.add_argument("-e", "--editors", type=int, default=EDITORS)
+    parser.add_argument("--edit-interval", type=float, default=EDIT_INTERVAL)
+    parser.add_argument("-c", "--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--token", action="append", help="terminal access token")
+    parser.add_argument(
+        "--header", action="append", default=[], help='editor header "Name: value"'
+    )
+    parser.add_argument("--event", type=int, action="append", help="event to patch")
+    parser.add_argument("--seed", type=int, default=0, help="events to create first")
+    parser.add_argument("--author", type=int, help="account ID for seeded events")
+    parser.add_argument("--address", type=int, help="address ID for new events")
+    return parser.parse_args()
+
+
+def get_actors(args):
+    """Returns the terminals and editors."""
+
+    tokens = get_tokens(args)
+    terminals = [
+        Terminal(tokens[index % len(tokens)]) for index in range(args.terminals)
+    ]
+
+    if not args.event or not args.header:
+        return terminals, []
+
+    headers = dict(header.split(": ", 1) for header in args.header)
+    template = None
+
+    if args.address:
+        template = {
+            "title": "Load test event",
+            "begin": date.today().isoformat(),
+            "address": args.address,
+        }
+
+    editors = [Editor(headers, args.event, template) for _ in range(args.editors)]
+    return terminals, editors
+
+
+def schedule(actors, duration, client, statistics, concurrency):
+    """Runs the actors at their intervals until the duration has passed."""
+
+    queue = Queue(maxsize=concurrency * 2)
+
+    def work():
+        while (actor := queue.get()) is not None:
+            try:
+                actor(client, statistics)
+            except Exception:  # pylint: disable=W0703
+                # Keep the worker alive, so that the queue does not block.
+                statistics.record("failures", 0, ERROR_STATUS)
+
+    threads = [Thread(target=work, daemon=True) for _ in range(concurrency)]
+
+    for thread in threads:
+        thread.start()
+
+    start = perf_counter()
+    heap = [
+        (uniform(0, interval), index, actor, interval)
+        for index, (actor, interval) in enumerate(actors)
+    ]
+    heap.sort()
+
+    while heap and (due := heap[0][0]) < duration:
+        if (delay := due - (perf_counter() - start)) > 0:
+            sleep(delay)
+
+        _, index, actor, interval = heappop(heap)
+        queue.put(actor)
+        heappush(heap, (due + uniform(0.5, 1.5) * interval, index, actor, interval))
+
+    for _ in threads:
+        queue.put(None)
+
+    for thread in threads:
+        thread.join()
+
+    return perf_counter() - start
+
+
+def main():
+    """Runs the load test."""
+
+    args = get_args()
+
+    if args.seed:
+        args.event = args.event or seed(args.seed, args.author, args.address)
+
+    client = InProcessClient() if args.url is None else HTTPClient(args.url)
+    terminals, editors = get_actors(args)
+    statistics = Statistics()
+    actors = [(terminal, args.interval) for terminal in terminals]
+    actors += [(editor, args.edit_interval) for editor in editors]
+    print(f"Simulating {len(terminals)} terminals and {len(editors)} editors.")
+    duration = schedule(actors, args.duration, client, statistics, args.concurrency)
+    statistics.report(duration)
+
+
+if __name__ == "__main__":
+    main()
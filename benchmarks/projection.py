@@ -0,0 +1,188 @@
+#! /usr/bin/env python3
+"""Benchmarks hydrated listings against column projections.
+
+Compares serializing event customers and sub-events via model
+instances and to_json(), including the foreign key dereference of
+the former EventCustomer.to_json(), with the .dicts() projections of
+hievents.orm.json_rows(). Reports time and allocations per listing
+and checks that both encode to the same JSON.
+"""
+
+from argparse import ArgumentParser
+from datetime import datetime, timedelta
+from time import perf_counter
+from tracemalloc import get_traced_memory, start, stop
+
+from peewee import CharField
+from peewee import DateTimeField
+from peewee import ForeignKeyField
+from peewee import Model
+from peewee import SqliteDatabase
+
+from hievents.encoding import dumps
+
+
+ROWS = 10_000
+CUSTOMERS = 100
+DATABASE = SqliteDatabase(":memory:")
+
+
+class BaseModel(Model):
+    """Stand-in base model to run without the hievents database stack."""
+
+    class Meta:
+        """Configures the database."""
+
+        database = DATABASE
+
+
+class Customer(BaseModel):
+    """Stand-in for mdb.Customer."""
+
+    name = CharField(255)
+
+
+class EventCustomer(BaseModel):
+    """Stand-in for hievents.orm.EventCustomer."""
+
+    event = CharField(255)
+    customer = ForeignKeyField(Customer, column_name="customer")
+
+
+class SubEvent(BaseModel):
+    """Stand-in for hievents.orm.SubEvent."""
+
+    event = CharField(255)
+    timestamp = DateTimeField()
+    caption = CharField(255, null=True)
+
+    def to_json(self):
+        """Returns a JSON-ish dictionary without null values
+        like peeweeplus.JSONModel.to_json().
+        """
+        return {
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in self.__data__.items()
+            if value is not None
+        }
+
+
+def get_args():
+    """Parses the command line arguments."""
+
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("-r", "--rows", type=int, default=ROWS)
+    return parser.parse_args()
+
+
+def seed(rows):
+    """Creates the tables and rows."""
+
+    DATABASE.create_tables([Customer, EventCustomer, SubEvent])
+    now = datetime.now()
+
+    with DATABASE.atomic():
+        Customer.insert_many(
+            [{"name": f"Customer #{index}"} for index in range(CUSTOMERS)]
+        ).execute()
+        EventCustomer.insert_many(
+            [
+                {"event": "event", "customer": index % CUSTOMERS + 1}
+                for index in range(rows)
+            ]
+        ).execute()
+        SubEvent.insert_many(
+            [
+                {
+                    "event": "event",
+                    "timestamp": now + timedelta(hours=index),
+                    "caption": None if index % 2 else "Concert",
+                }
+                for index in range(rows)
+            ]
+        ).execute()
+
+
+def json_rows(query):
+    """Copy of hievents.orm.json_rows(), which needs the full stack."""
+
+    return [
+        {key: value for key, value in row.items() if value is not None}
+        for row in query.dicts().iterator()
+    ]
+
+
+def hydrated_customers():
+    """Serializes event customers like the former to_json()."""
+
+    return [
+        {"id": record.id, "customer": record.customer.id}
+        for record in EventCustomer.select().order_by(EventCustomer.id)
+    ]
+
+
+def projected_customers():
+    """Serializes event customers from a projection."""
+
+    return json_rows(
+        EventCustomer.select(EventCustomer.id, EventCustomer.customer).order_by(
+            EventCustomer.id
+        )
+    )
+
+
+def hydrated_sub_events():
+    """Serializes sub-events via model instances."""
+
+    return [record.to_json() for record in SubEvent.select()]
+
+
+def projected_sub_events():
+    """Serializes sub-events from a projection."""
+
+    return json_rows(
+        SubEvent.select(
+            SubEvent.id, SubEvent.event, SubEvent.timestamp, SubEvent.caption
+        )
+    )
+
+
+def measure(function):
+    """Returns the result, seconds and peak allocated bytes of the function."""
+
+    start()
+    begin = perf_counter()
+    result = function()
+    seconds = perf_counter() - begin
+    _, peak = get_traced_memory()
+    stop()
+    return result, seconds, peak
+
+
+def main():
+    """Runs the benchmark."""
+
+    args = get_args()
+    seed(args.rows)
+    print(f"Listing {args.rows} rows (time and peak allocations under tracemalloc):")
+
+    for name, hydrated, projected in (
+        ("event customers", hydrated_customers, projected_customers),
+        ("sub-events", hydrated_sub_events, projected_sub_events),
+    ):
+        expected, *hydrated_stats = measure(hydrated)
+        result, *projected_stats = measure(projected)
+        assert dumps(result) == dumps(expected), f"{name}: projection differs"
+
+        for variant, (seconds, peak) in (
+            ("hydrated", hydrated_stats),
+            ("projected", projected_stats),
+        ):
+            print(
+                f"{name:>16} {variant:>10}: {seconds * 1000:8.1f} ms"
+                f"{peak / 1024:10.0f} KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#! /usr/bin/env python3
+"""Measures the import time of the WSGI application.
+
+Fails if the median import time exceeds the budget or
+if lazily loaded modules are imported at startup.
+"""
+
+from argparse import ArgumentParser
+from statistics import median
+from subprocess import run
+from sys import executable, exit  # pylint: disable=W0622
+from time import perf_counter
+
+
+MODULE = "hievents.wsgi"
+BUDGET = 1.0
+RUNS = 5
+LAZY_MODULES = ("PIL", "hinews.watermark")
+CHECK = (
+    "import sys, {module}; "
+    "loaded = [name for name in {lazy!r} if name in sys.modules]; "
+    "sys.exit(', '.join(loaded) or None)"
+)
+
+
+def get_args():
+    """Parses the command line arguments."""
+
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("-b", "--budget", type=float, default=BUDGET, help="seconds")
+    parser.add_argument("-n", "--runs", type=int, default=RUNS)
+    parser.add_argument("-m", "--module", default=MODULE)
+    parser.add_argument(
+        "-t", "--top", type=int, default=10, help="show the slowest imports"
+    )
+    return parser.parse_args()
+
+
+def time_import(module):
+    """Imports the module in a fresh interpreter and returns
+    the wall time and the output of -X importtime.
+    """
+
+    start = perf_counter()
+    result = run(
+        [executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return perf_counter() - start, result.stderr
+
+
+def slowest_imports(importtime, top):
+    """Returns the slowest imports by cumulative time in µs."""
+
+    imports = []
+
+    for line in importtime.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        imports.append((int(cumulative), name.strip()))
+
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    """Runs the benchmark."""
+
+    args = get_args()
+    times = []
+
+    for _ in range(args.runs):
+        seconds, importtime = time_import(args.module)
+        times.append(seconds)
+
+    for cumulative, name in slowest_imports(importtime, args.top):
+        print(f"{cumulative / 1e6:8.3f} s  {name}")
+
+    result = median(times)
+    print(f"Median import time of {args.module}: {result:.3f} s")
+    print(f"Budget: {args.budget:.3f} s")
+    check = run(
+        [executable, "-c", CHECK.format(module=args.module, lazy=LAZY_MODULES)],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    if check.returncode != 0:
+        print(f"Eagerly imported: {check.stderr.strip()}")
+        exit(1)
+
+    if result > args.budget:
+        print("Startup time budget exceeded.")
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
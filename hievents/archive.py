@@ -0,0 +1,163 @@
+"""Archival of expired events into the archive tables."""
+
+from argparse import ArgumentParser
+from datetime import date, datetime, timedelta
+from logging import INFO, basicConfig, getLogger
+
+from peewee import Value, fn
+
+from hievents.config import get_config
+from hievents.orm import DATABASE, ARCHIVES, ArchivedEvent, Event, PriceSummary
+
+__all__ = ["expired", "archive", "restore", "main"]
+
+
+GRACE = timedelta(days=get_config().getint("archive", "grace_days", fallback=30))
+BATCH_SIZE = 100
+LOGGER = getLogger("hievents.archive")
+
+
+def expired(grace=GRACE):
+    """Returns a peewee expression for events whose active_until
+    or, if unset, end date lies more than the grace period back.
+
+    Restored events are only archived again if they expire after
+    they have been restored, e.g. once their dates were extended.
+    """
+
+    expiry = fn.COALESCE(Event.active_until, Event.end)
+    return (expiry < date.today() - grace) & (
+        (Event.restored >> None) | (expiry > Event.restored)
+    )
+
+
+def _copy(source, target, condition, **values):
+    """Copies the matching records of the source model into the target
+    model via INSERT … SELECT, keeping their IDs.
+    """
+
+    fields = [
+        field
+        for field in source._meta.sorted_fields
+        if field.name in target._meta.fields
+    ]
+    query = source.select(*fields, *map(Value, values.values())).where(condition)
+    columns = [target._meta.fields[field.name] for field in fields]
+    columns += [target._meta.fields[name] for name in values]
+    return target.insert_from(query, columns).execute()
+
+
+def _event_condition(model, idents):
+    """Returns the condition selecting the model's records of the events."""
+
+    if model in {Event, ArchivedEvent}:
+        return model.id.in_(idents)
+
+    return model.event.in_(idents)
+
+
+def _archive_batch(idents):
+    """Moves the respective events and their relations into the archive."""
+
+    with DATABASE.atomic():
+        archived = datetime.now()
+
+        for model, archive_model in ARCHIVES:
+            values = {"archived": archived} if archive_model is ArchivedEvent else {}
+            _copy(model, archive_model, _event_condition(model, idents), **values)
+
+        PriceSummary.delete().where(PriceSummary.event.in_(idents)).execute()
+
+        # Delete children first, since databases may not cascade.
+        for model, _ in reversed(ARCHIVES):
+            model.delete().where(_event_condition(model, idents)).execute()
+
+
+def archive(grace=GRACE, batch_size=BATCH_SIZE):
+    """Archives expired events in batched transactions
+    and returns the number of archived events.
+    """
+
+    archived = 0
+
+    while idents := [
+        event.id
+        for event in Event.select(Event.id)
+        .where(expired(grace))
+        .order_by(Event.id)
+        .limit(batch_size)
+    ]:
+        _archive_batch(idents)
+        archived += len(idents)
+        LOGGER.info("Archived %i events.", archived)
+
+    return archived
+
+
+def restore(ident):
+    """Moves the respective archived event and its relations
+    back into the hot tables and returns the restored event.
+    """
+
+    with DATABASE.atomic():
+        ArchivedEvent.get_by_id(ident)
+
+        for model, archive_model in ARCHIVES:
+            _copy(archive_model, model, _event_condition(archive_model, [ident]))
+
+        for _, archive_model in reversed(ARCHIVES):
+            archive_model.delete().where(
+                _event_condition(archive_model, [ident])
+            ).execute()
+
+        Event.update(restored=date.today()).where(Event.id == ident).execute()
+        PriceSummary.refresh(ident)
+        Event.bump_revision(ident)
+
+    return Event.get_by_id(ident)
+
+
+def get_args():
+    """Parses the command line arguments."""
+
+    parser = ArgumentParser(description="Archives expired hievents events.")
+    parser.add_argument(
+        "-g",
+        "--grace-days",
+        type=int,
+        default=GRACE.days,
+        help="days after expiry before archival",
+    )
+    parser.add_argument(
+        "-b",
+        "--batch-size",
+        type=int,
+        default=BATCH_SIZE,
+        help="events per transaction",
+    )
+    parser.add_argument(
+        "-r", "--restore", type=int, metavar="EVENT", help="restore an archived event"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Archives expired events or restores an archived event."""
+
+    args = get_args()
+    basicConfig(level=INFO, format="[%(levelname)s] %(name)s: %(message)s")
+
+    with DATABASE.connection_context():
+        if args.restore is not None:
+            try:
+                restore(args.restore)
+            except ArchivedEvent.DoesNotExist:
+                LOGGER.error("No such archived event: #%i.", args.restore)
+                return 1
+
+            LOGGER.info("Restored event #%i.", args.restore)
+            return 0
+
+        archive(grace=timedelta(days=args.grace_days), batch_size=args.batch_size)
+
+    return 0
@@ -0,0 +1,274 @@
+"""File system cache for rendered output, shared by all local workers."""
+
+from argparse import ArgumentParser
+from contextlib import contextmanager
+from fcntl import LOCK_EX, LOCK_UN, flock
+from logging import INFO, basicConfig, getLogger
+from os import fstat, replace
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from time import time
+
+from hievents.config import get_config
+from hievents.singleflight import SingleFlight
+
+__all__ = [
+    "CACHE_DIR",
+    "get_path",
+    "contains",
+    "load",
+    "store",
+    "tee",
+    "lock",
+    "fetch",
+    "fill",
+    "stream",
+    "purge",
+    "main",
+]
+
+
+CACHE_DIR = Path(
+    get_config().get("cache", "directory", fallback="/var/cache/hievents")
+)
+MAX_AGE = get_config().getint("cache", "max_age", fallback=7 * 24 * 3600)
+PROCESS_LOCKS = get_config().getboolean("cache", "process_locks", fallback=True)
+FLIGHTS = SingleFlight()
+# Per-key locks of this process for streams without process locks.
+THREAD_LOCKS = {}
+THREAD_LOCKS_LOCK = Lock()
+LOCKS = ".locks"
+BLOCK_SIZE = 64 * 1024
+LOGGER = getLogger("hievents.cache")
+
+
+def get_path(key):
+    """Returns the path of the cache entry for the hexadecimal key."""
+
+    return CACHE_DIR / key[:2] / key
+
+
+def contains(key):
+    """Checks whether the cache has an entry for the key."""
+
+    return get_path(key).exists()
+
+
+def load(key):
+    """Returns the cached bytes or None."""
+
+    try:
+        return get_path(key).read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def _temporary_file(path):
+    """Returns a temporary file next to the cache entry."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return NamedTemporaryFile(dir=path.parent, prefix=".", delete=False)
+
+
+def _write(key, chunks):
+    """Atomically stores the chunks in the cache."""
+
+    path = get_path(key)
+    complete = False
+
+    with _temporary_file(path) as file:
+        try:
+            for chunk in chunks:
+                file.write(chunk)
+
+            complete = True
+        finally:
+            if not complete:
+                Path(file.name).unlink()
+
+    replace(file.name, path)
+
+
+def store(key, bytes_):
+    """Atomically stores the bytes in the cache."""
+
+    _write(key, (bytes_,))
+
+
+def tee(key, chunks):
+    """Yields the chunks while writing them to the cache.
+
+    The entry is only stored if all chunks have been consumed,
+    so that aborted streams do not leave truncated entries.
+    """
+
+    path = get_path(key)
+    complete = False
+
+    with _temporary_file(path) as file:
+        try:
+            for chunk in chunks:
+                file.write(chunk)
+                yield chunk
+
+            complete = True
+        finally:
+            if not complete:
+                Path(file.name).unlink()
+
+    replace(file.name, path)
+
+
+def _open_lock(path):
+    """Opens and locks the lock file, retrying if it was
+    removed by its previous holder while waiting.
+    """
+
+    while True:
+        file = path.open("a")
+        flock(file, LOCK_EX)
+
+        try:
+            if fstat(file.fileno()).st_ino == path.stat().st_ino:
+                return file
+        except FileNotFoundError:
+            pass
+
+        file.close()
+
+
+@contextmanager
+def lock(key):
+    """Exclusively locks the cache entry across local processes.
+
+    The holder removes the lock file, so lock files do not pile up.
+    """
+
+    path = CACHE_DIR / LOCKS / key
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with _open_lock(path) as file:
+        try:
+            yield
+        finally:
+            path.unlink(missing_ok=True)
+            flock(file, LOCK_UN)
+
+
+@contextmanager
+def _thread_lock(key):
+    """Exclusively locks the cache entry within this process."""
+
+    with THREAD_LOCKS_LOCK:
+        entry = THREAD_LOCKS.setdefault(key, [Lock(), 0])
+        entry[1] += 1
+
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with THREAD_LOCKS_LOCK:
+            entry[1] -= 1
+
+            if not entry[1]:
+                del THREAD_LOCKS[key]
+
+
+def _render(key, render):
+    """Renders and stores the entry unless another process has."""
+
+    if not PROCESS_LOCKS:
+        store(key, bytes_ := render())
+        return bytes_
+
+    with lock(key):
+        if (bytes_ := load(key)) is not None:
+            return bytes_
+
+        store(key, bytes_ := render())
+        return bytes_
+
+
+def fetch(key, render):
+    """Returns the cached bytes or renders and stores them.
+
+    Concurrent misses of the same key in this process wait for a
+    single rendering and, with process locks, so do other processes.
+    """
+
+    if (bytes_ := load(key)) is not None:
+        return bytes_
+
+    return FLIGHTS.do(key, _render, key, render)
+
+
+def fill(key, chunks):
+    """Stores the chunks unless the cache has an entry for the key.
+
+    Concurrent fills of the same key wait for the first one, so the
+    chunks are consumed once. The lock is only held while writing.
+    """
+
+    with lock(key) if PROCESS_LOCKS else _thread_lock(key):
+        if not contains(key):
+            _write(key, chunks)
+
+
+def stream(key, chunks):
+    """Fills the entry if needed and yields it in blocks.
+
+    The entry is read outside of its lock, so slow clients
+    do not block other requests of the same entry.
+    """
+
+    if not contains(key):
+        fill(key, chunks)
+
+    with get_path(key).open("rb") as file:
+        while block := file.read(BLOCK_SIZE):
+            yield block
+
+
+def purge(max_age=MAX_AGE):
+    """Removes entries and leftover temporary files created more than
+    max_age seconds ago and returns the number of removed files.
+
+    Loading entries does not renew them, since the entries of changed
+    feeds are superseded by new ETags. Purged entries that are still
+    in use are rendered again on demand.
+    """
+
+    threshold = time() - max_age
+    removed = 0
+
+    for path in CACHE_DIR.glob("*/*"):
+        if path.parent.name == LOCKS:
+            continue
+
+        try:
+            if path.stat().st_mtime < threshold:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            continue
+
+    return removed
+
+
+def get_args():
+    """Parses the command line arguments."""
+
+    parser = ArgumentParser(description="Purges the hievents cache.")
+    parser.add_argument(
+        "-a", "--max-age", type=int, default=MAX_AGE, help="maximum age in seconds"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Purges old cache entries."""
+
+    args = get_args()
+    basicConfig(level=INFO, format="[%(levelname)s] %(name)s: %(message)s")
+    LOGGER.info("Purged %i cache files.", purge(args.max_age))
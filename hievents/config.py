@@ -0,0 +1,19 @@
+"""Configuration file parsing."""
+
+from configparser import ConfigParser
+from functools import lru_cache
+from os import environ
+
+__all__ = ["CONFIG_FILE", "get_config"]
+
+
+CONFIG_FILE = environ.get("HIEVENTS_CONFIG", "/usr/local/etc/hievents.conf")
+
+
+@lru_cache()
+def get_config():
+    """Returns the parsed configuration file."""
+
+    config = ConfigParser()
+    config.read(CONFIG_FILE)
+    return config
@@ -0,0 +1,183 @@
+"""Database connection handling."""
+
+from contextlib import contextmanager, nullcontext
+from threading import local
+
+from peewee import DatabaseError, InterfaceError, SqliteDatabase
+from playhouse.pool import PooledDatabase, PooledMySQLDatabase, PooledSqliteDatabase
+
+from peeweeplus import MySQLDatabaseProxy
+
+from hievents.config import get_config
+
+__all__ = [
+    "RoutingDatabase",
+    "get_database",
+    "get_schema",
+    "check_health",
+    "use_replica",
+    "keep_routing",
+    "release",
+]
+
+
+MAX_CONNECTIONS = 8
+STALE_TIMEOUT = 300
+TIMEOUT = 10
+
+
+class RoutingDatabase:
+    """Routes queries to the primary database or, within
+    a read-only context of the current thread, to a replica.
+    """
+
+    def __init__(self, primary, replica):
+        self.primary = primary
+        self.replica = replica
+        self._local = local()
+
+    def __getattr__(self, attribute):
+        return getattr(self.current, attribute)
+
+    @property
+    def current(self):
+        """Returns the database of the current thread's context."""
+        if getattr(self._local, "read_only", False):
+            return self.replica
+
+        return self.primary
+
+    @contextmanager
+    def read_only(self):
+        """Routes queries of the current thread to the replica."""
+        previous = getattr(self._local, "read_only", False)
+        self._local.read_only = True
+
+        try:
+            yield self.replica
+        finally:
+            self._local.read_only = previous
+
+    def is_closed(self):
+        """Checks whether both connections are closed."""
+        return self.primary.is_closed() and self.replica.is_closed()
+
+    def close(self):
+        """Closes both connections."""
+        for database in (self.primary, self.replica):
+            if not database.is_closed():
+                database.close()
+
+
+def _get_pooled_database(section, name):
+    """Returns a pooled database for the configuration section."""
+
+    pool_settings = {
+        "max_connections": section.getint("max_connections", MAX_CONNECTIONS),
+        "stale_timeout": section.getint("stale_timeout", STALE_TIMEOUT),
+        "timeout": section.getint("timeout", TIMEOUT),
+    }
+
+    if section.get("backend", "mysql") == "sqlite":
+        return PooledSqliteDatabase(
+            section.get("database", f"{name}.sqlite3"), **pool_settings
+        )
+
+    return PooledMySQLDatabase(
+        section.get("database", name),
+        host=section.get("host", "localhost"),
+        port=section.getint("port", 3306),
+        user=section.get("user"),
+        passwd=section.get("passwd"),
+        **pool_settings,
+    )
+
+
+def get_database(name):
+    """Returns the configured database.
+
+    Unless pooling is enabled in the [db] section of the
+    configuration file, this is the plain MySQL database proxy.
+    If a [replica] section is configured, queries are routed
+    through a RoutingDatabase.
+    """
+
+    config = get_config()
+
+    if config.getboolean("db", "pool", fallback=False):
+        database = _get_pooled_database(config["db"], name)
+    else:
+        database = MySQLDatabaseProxy(name)
+
+    if not config.has_section("replica"):
+        return database
+
+    return RoutingDatabase(database, _get_pooled_database(config["replica"], name))
+
+
+def get_schema(database):
+    """Returns the schema name for the database's models."""
+
+    if isinstance(database, RoutingDatabase):
+        database = database.primary
+
+    if isinstance(database, SqliteDatabase):
+        return None
+
+    return database.database
+
+
+def check_health(database):
+    """Checks whether the database answers a trivial query."""
+
+    try:
+        database.execute_sql("SELECT 1")
+    except (DatabaseError, InterfaceError):
+        return False
+
+    return True
+
+
+def use_replica(database):
+    """Returns a context manager routing queries to the replica, if any."""
+
+    if isinstance(database, RoutingDatabase):
+        return database.read_only()
+
+    return nullcontext()
+
+
+def _on_replica(database, iterable):
+    """Yields the items of the iterable, consumed on the replica."""
+
+    with database.read_only():
+        yield from iterable
+
+
+def keep_routing(database, iterable):
+    """Returns an iterator consuming the iterable with the current
+    thread's routing, e.g. for response bodies streamed after their
+    read-only handler has returned.
+    """
+
+    if isinstance(database, RoutingDatabase) and database.current is database.replica:
+        return _on_replica(database, iterable)
+
+    return iter(iterable)
+
+
+def release(database):
+    """Returns the current thread's pooled connections to their pools.
+
+    Unpooled connections stay open for the thread's next request,
+    to avoid connecting and authenticating on every request.
+    """
+
+    if isinstance(database, RoutingDatabase):
+        databases = (database.primary, database.replica)
+    else:
+        databases = (database,)
+
+    for database_ in databases:
+        if isinstance(database_, PooledDatabase) and not database_.is_closed():
+            database_.close()
@@ -0,0 +1,37 @@
+"""JSON encoding of model serializations in the wsgilib.JSON format."""
+
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from json import JSONEncoder
+from uuid import UUID
+
+__all__ = ["dumps"]
+
+
+def _default(obj):
+    """Converts types unknown to the JSON encoder."""
+
+    if isinstance(obj, Decimal):
+        return float(obj)
+
+    if isinstance(obj, (date, datetime, time)):
+        return obj.isoformat()
+
+    if isinstance(obj, Enum):
+        return obj.value
+
+    if isinstance(obj, UUID):
+        return str(obj)
+
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj, *, _encode=JSONEncoder(default=_default).encode):
+    """Encodes the object with the C-accelerated standard library encoder.
+
+    The output is byte-identical to json.dumps() with default settings,
+    as used by wsgilib.JSON; benchmarks/json_encoding.py verifies this.
+    """
+
+    return _encode(obj).encode()
@@ -0,0 +1,262 @@
+"""Streaming iCalendar and CSV export feeds."""
+
+from csv import writer
+from datetime import date, timedelta, timezone
+from hashlib import sha256
+from io import StringIO
+
+from his.orm import Account
+from mdb import Address
+
+from hievents import cache
+from hievents.encoding import dumps
+from hievents.orm import customer_events, events_to_json, Editor, Event, SubEvent
+
+__all__ = [
+    "fingerprint",
+    "icalendar",
+    "csv",
+    "json",
+    "customer_feed",
+    "prerender",
+]
+
+
+CRLF = "\r\n"
+PRODID = "-//HOMEINFO//hievents//DE"
+CSV_HEADER = (
+    "id",
+    "title",
+    "subtitle",
+    "begin",
+    "end",
+    "active_until",
+    "address",
+    "latitude",
+    "longitude",
+)
+
+
+def _update(hash_, query):
+    """Updates the hash with the rows of the query."""
+
+    for row in query.tuples().iterator():
+        hash_.update(f"{row!r};".encode())
+
+
+def fingerprint(kind, events, *context):
+    """Returns an ETag of the feed, derived from the events' revisions.
+
+    Changes of the addresses and of the authors' and editors'
+    accounts, which are embedded in the feeds, do not bump the
+    revisions, so their rows are hashed as well. This is still
+    much cheaper than rendering the feed. The current date is
+    included, since feeds may filter by active dates.
+    """
+
+    revisions = events.select(Event.id, Event.revision).order_by(Event.id)
+    hash_ = sha256(f"{kind}:{date.today()}:{context}".encode())
+    _update(hash_, revisions)
+    _update(
+        hash_,
+        Address.select()
+        .where(Address.id.in_(events.select(Event.address)))
+        .order_by(Address.id),
+    )
+    editors = Editor.select(Editor.account).where(
+        Editor.event.in_(events.select(Event.id))
+    )
+    _update(
+        hash_,
+        Account.select()
+        .where(
+            Account.id.in_(events.select(Event.author)) | Account.id.in_(editors)
+        )
+        .order_by(Account.id),
+    )
+    return hash_.hexdigest()
+
+
+def _escape(text):
+    """Escapes text values of iCalendar properties."""
+
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line):
+    """Folds the content line into lines of at most 75 octets."""
+
+    encoded = line.encode()
+
+    if len(encoded) <= 75:
+        return line + CRLF
+
+    lines = []
+
+    while encoded:
+        size = 75 if not lines else 74
+        # Do not split UTF-8 multi-byte sequences.
+        while size < len(encoded) and encoded[size] & 0xC0 == 0x80:
+            size -= 1
+
+        lines.append(encoded[:size].decode())
+        encoded = encoded[size:]
+
+    return (CRLF + " ").join(lines) + CRLF
+
+
+def _content(name, value):
+    """Returns an encoded content line."""
+
+    return _fold(f"{name}:{value}").encode()
+
+
+def _vevent(uid, created, start, summary, *properties):
+    """Yields the encoded lines of a VEVENT."""
+
+    yield _content("BEGIN", "VEVENT")
+    yield _content("UID", uid)
+    # RFC 5545 requires UTC. Naive timestamps are local time.
+    yield _content(
+        "DTSTAMP", created.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    )
+    yield _content(*start)
+    yield _content("SUMMARY", _escape(summary))
+
+    for prop in properties:
+        yield _content(*prop)
+
+    yield _content("END", "VEVENT")
+
+
+def _event_vevent(event):
+    """Yields the encoded lines of the event's VEVENT."""
+
+    properties = [("LOCATION", _escape(str(event.address)))]
+
+    if event.subtitle:
+        properties.append(("DESCRIPTION", _escape(event.subtitle)))
+
+    if event.end:
+        # DTEND of all-day events is exclusive.
+        end = event.end + timedelta(days=1)
+        properties.append(("DTEND;VALUE=DATE", end.strftime("%Y%m%d")))
+
+    yield from _vevent(
+        f"event-{event.id}@hievents",
+        event.created,
+        ("DTSTART;VALUE=DATE", event.begin.strftime("%Y%m%d")),
+        event.title,
+        *properties,
+    )
+
+
+def _sub_event_vevent(sub_event):
+    """Yields the encoded lines of the sub-event's VEVENT."""
+
+    yield from _vevent(
+        f"sub-event-{sub_event.id}@hievents",
+        sub_event.event.created,
+        ("DTSTART", sub_event.timestamp.strftime("%Y%m%dT%H%M%S")),
+        sub_event.caption or sub_event.event.title,
+        ("RELATED-TO", f"event-{sub_event.event_id}@hievents"),
+    )
+
+
+def icalendar(events):
+    """Yields an iCalendar feed of the events and their sub-events.
+
+    Rows are streamed from the database cursors.
+    """
+
+    yield _content("BEGIN", "VCALENDAR")
+    yield _content("VERSION", "2.0")
+    yield _content("PRODID", PRODID)
+
+    for event in events.iterator():
+        yield from _event_vevent(event)
+
+    sub_events = (
+        SubEvent.select(SubEvent, Event)
+        .join(Event)
+        .where(SubEvent.event.in_(events.select(Event.id)))
+        .order_by(SubEvent.event, SubEvent.timestamp)
+    )
+
+    for sub_event in sub_events.iterator():
+        yield from _sub_event_vevent(sub_event)
+
+    yield _content("END", "VCALENDAR")
+
+
+def _csv_row(row):
+    """Returns an encoded CSV row."""
+
+    buffer = StringIO()
+    writer(buffer).writerow(row)
+    return buffer.getvalue().encode()
+
+
+def _isoformat(value):
+    """Returns the ISO format of an optional date."""
+
+    return None if value is None else value.isoformat()
+
+
+def csv(events):
+    """Yields a CSV feed of the events.
+
+    Rows are streamed from the database cursor.
+    """
+
+    yield _csv_row(CSV_HEADER)
+
+    for event in events.iterator():
+        yield _csv_row(
+            (
+                event.id,
+                event.title,
+                event.subtitle,
+                _isoformat(event.begin),
+                _isoformat(event.end),
+                _isoformat(event.active_until),
+                str(event.address),
+                event.latitude,
+                event.longitude,
+            )
+        )
+
+
+def json(events):
+    """Yields the JSON listing of the events."""
+
+    yield dumps(events_to_json(events))
+
+
+CUSTOMER_FEEDS = {"ics": icalendar, "json": json}
+
+
+def customer_feed(kind, customer):
+    """Returns the ETag and the lazily rendered chunks of the customer's feed."""
+
+    events = customer_events(customer)
+    etag = fingerprint(kind, events, customer.id)
+    return etag, CUSTOMER_FEEDS[kind](events)
+
+
+def prerender(kind, customer):
+    """Renders the customer's feed into the cache
+    unless it is already cached and returns its ETag.
+    """
+
+    etag, chunks = customer_feed(kind, customer)
+
+    if not cache.contains(etag):
+        cache.fill(etag, chunks)
+
+    return etag
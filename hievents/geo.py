@@ -0,0 +1,54 @@
+"""Proximity search over event coordinates."""
+
+from math import asin, cos, degrees, radians, sin, sqrt
+
+from hievents.orm import Event
+
+__all__ = ["distance", "nearby"]
+
+
+EARTH_RADIUS = 6371.0  # km
+
+
+def distance(latitude, longitude, other_latitude, other_longitude):
+    """Returns the great-circle distance in km."""
+
+    phi, other_phi = radians(latitude), radians(other_latitude)
+    delta_phi = other_phi - phi
+    delta_lambda = radians(other_longitude - longitude)
+    haversine = (
+        sin(delta_phi / 2) ** 2
+        + cos(phi) * cos(other_phi) * sin(delta_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS * asin(sqrt(haversine))
+
+
+def _bounding_box(latitude, longitude, radius):
+    """Returns a peewee expression for the bounding box around the location."""
+
+    delta_latitude = degrees(radius / EARTH_RADIUS)
+    delta_longitude = degrees(
+        radius / (EARTH_RADIUS * max(cos(radians(latitude)), 1e-6))
+    )
+    return Event.latitude.between(
+        latitude - delta_latitude, latitude + delta_latitude
+    ) & Event.longitude.between(
+        longitude - delta_longitude, longitude + delta_longitude
+    )
+
+
+def nearby(events, latitude, longitude, radius):
+    """Returns (event, distance) pairs within the radius in km, nearest first.
+
+    The indexed bounding box narrows down the candidates,
+    the exact distance is then computed for those only.
+    """
+
+    candidates = (
+        (event, distance(latitude, longitude, event.latitude, event.longitude))
+        for event in events.where(_bounding_box(latitude, longitude, radius))
+    )
+    return sorted(
+        ((event, dist) for event, dist in candidates if dist <= radius),
+        key=lambda item: item[1],
+    )
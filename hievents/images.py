@@ -0,0 +1,30 @@
+"""Cached image renderings, shared by handlers, jobs and the warm-up."""
+
+from functools import partial
+
+from hievents import cache
+
+__all__ = ["watermarked"]
+
+
+def _render(image):
+    """Renders the watermarked image."""
+
+    try:
+        return image.watermarked
+    except OSError:  # Not an image.
+        return image.file.bytes
+
+
+def watermarked(image, etag=None):
+    """Returns the watermarked image from the cache
+    or renders it and stores it in the cache.
+
+    Images with the same content and source share the rendering,
+    and concurrent requests for it wait for a single rendering.
+    """
+
+    if etag is None:
+        etag = image.watermark_etag
+
+    return cache.fetch(etag, partial(_render, image))
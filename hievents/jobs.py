@@ -0,0 +1,165 @@
+"""Background jobs and the worker process running them."""
+
+from argparse import ArgumentParser
+from datetime import timedelta
+from logging import INFO, basicConfig, getLogger
+from time import monotonic, sleep
+from traceback import format_exc
+
+from filedb import File
+from mdb import Customer
+
+from hievents.config import get_config
+from hievents.feeds import CUSTOMER_FEEDS, prerender
+from hievents.images import watermarked
+from hievents.orm import (
+    DATABASE,
+    ArchivedImage,
+    EventCustomer,
+    Image,
+    ImageFile,
+    Job,
+)
+
+__all__ = [
+    "HANDLERS",
+    "handler",
+    "enqueue_feed_rebuilds",
+    "enqueue_watermark",
+    "run",
+    "work",
+    "main",
+]
+
+
+HANDLERS = {}
+INTERVAL = 2
+STALE_TIMEOUT = timedelta(minutes=30)
+RETENTION = timedelta(days=get_config().getint("jobs", "retention_days", fallback=7))
+PRUNE_INTERVAL = 3600
+LOGGER = getLogger("hievents.worker")
+
+
+def handler(name):
+    """Registers a function as handler of the respective jobs."""
+
+    def decorator(function):
+        HANDLERS[name] = function
+        return function
+
+    return decorator
+
+
+def enqueue_feed_rebuilds(event):
+    """Enqueues rebuilds of the feeds of the event's customers."""
+
+    for customer in EventCustomer.select(EventCustomer.customer).where(
+        EventCustomer.event == event
+    ):
+        Job.enqueue(
+            "rebuild_feeds",
+            key=f"rebuild_feeds:{customer.customer_id}",
+            customer=customer.customer_id,
+        )
+
+
+def enqueue_watermark(image):
+    """Enqueues pre-rendering of the watermarked image."""
+
+    Job.enqueue("render_watermark", key=f"render_watermark:{image.id}", image=image.id)
+
+
+@handler("render_watermark")
+def render_watermark(image):
+    """Renders the watermarked image into the cache."""
+
+    try:
+        image = Image.get_by_id(image)
+    except Image.DoesNotExist:
+        return
+
+    watermarked(image)
+
+
+@handler("rebuild_feeds")
+def rebuild_feeds(customer):
+    """Renders the customer's feeds into the cache."""
+
+    customer = Customer.get_by_id(customer)
+
+    for kind in CUSTOMER_FEEDS:
+        prerender(kind, customer)
+
+
+@handler("delete_file")
+def delete_file(file):
+    """Deletes an image file no longer referenced by any image."""
+
+    if ImageFile.select().where(ImageFile.file == file).exists():
+        return  # Referenced again in the meantime.
+
+    if Image.select().where(Image.file == file).exists():
+        return
+
+    if ArchivedImage.select().where(ArchivedImage.file == file).exists():
+        return
+
+    File.delete().where(File.id == file).execute()
+
+
+def run(job):
+    """Runs the respective job."""
+
+    LOGGER.info("Running job #%i %s (attempt %i).", job.id, job.name, job.attempts)
+
+    try:
+        HANDLERS[job.name](**job.kwargs)
+    except Exception:  # pylint: disable=W0703
+        LOGGER.exception("Job #%i %s failed.", job.id, job.name)
+        job.fail(format_exc())
+    else:
+        LOGGER.info("Job #%i %s done.", job.id, job.name)
+        job.succeed()
+
+
+def work(interval=INTERVAL, once=False):
+    """Runs due jobs and polls for new ones."""
+
+    pruned = None
+
+    while True:
+        with DATABASE.connection_context():
+            Job.requeue_stale(STALE_TIMEOUT)
+
+            if pruned is None or monotonic() - pruned > PRUNE_INTERVAL:
+                Job.prune(RETENTION)
+                pruned = monotonic()
+
+            while (job := Job.claim()) is not None:
+                run(job)
+
+        if once:
+            return
+
+        sleep(interval)
+
+
+def get_args():
+    """Parses the command line arguments."""
+
+    parser = ArgumentParser(description="Runs hievents background jobs.")
+    parser.add_argument(
+        "-i", "--interval", type=float, default=INTERVAL, help="polling interval"
+    )
+    parser.add_argument(
+        "-1", "--once", action="store_true", help="exit when no job is due"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Runs the worker."""
+
+    args = get_args()
+    basicConfig(level=INFO, format="[%(levelname)s] %(name)s: %(message)s")
+    work(interval=args.interval, once=args.once)
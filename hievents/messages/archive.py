@@ -0,0 +1,17 @@
+"""Archive related messages."""
+
+from hievents.messages.common import EventsMessage
+
+__all__ = ["NoSuchArchivedEvent", "EventRestored"]
+
+
+class NoSuchArchivedEvent(EventsMessage):
+    """Indicates that the respective archived event does not exist."""
+
+    STATUS = 404
+
+
+class EventRestored(EventsMessage):
+    """Indicates that the respective event was successfully restored."""
+
+    STATUS = 200
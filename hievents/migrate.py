@@ -0,0 +1,129 @@
+"""Migrations of existing databases to the current schema.
+
+Each migration checks the schema or data first, so running
+all of them again is safe.
+"""
+
+from logging import INFO, basicConfig, getLogger
+
+from peewee import SqliteDatabase
+from playhouse.migrate import MySQLMigrator, SqliteMigrator, migrate
+
+from mdb import Address
+
+from hievents.database import RoutingDatabase
+from hievents.orm import DATABASE, Event, PriceSummary, create_tables
+
+__all__ = ["MIGRATIONS", "run", "main"]
+
+
+LOGGER = getLogger("hievents.migrate")
+
+
+def _get_database():
+    """Returns the primary database."""
+
+    if isinstance(DATABASE, RoutingDatabase):
+        return DATABASE.primary
+
+    return DATABASE
+
+
+def _get_migrator():
+    """Returns the schema migrator for the primary database."""
+
+    if isinstance(database := _get_database(), SqliteDatabase):
+        return SqliteMigrator(database)
+
+    return MySQLMigrator(database)
+
+
+def _add_columns(model, *fields):
+    """Adds the fields' columns to the model's table unless present."""
+
+    table = model._meta.table_name
+    database = _get_database()
+    columns = {column.name for column in database.get_columns(table)}
+    migrator = _get_migrator()
+    operations = [
+        migrator.add_column(table, field.column_name, field)
+        for field in fields
+        if field.column_name not in columns
+    ]
+
+    if operations:
+        migrate(*operations)
+
+    return len(operations)
+
+
+def _add_index(model, columns, unique=False):
+    """Adds the index to the model's table unless present."""
+
+    table = model._meta.table_name
+
+    for index in _get_database().get_indexes(table):
+        if tuple(index.columns) == tuple(columns):
+            return 0
+
+    migrate(_get_migrator().add_index(table, columns, unique))
+    return 1
+
+
+def event_coordinates():
+    """Adds the event coordinates and backfills them from the addresses."""
+
+    _add_columns(Event, Event.latitude, Event.longitude)
+    _add_index(Event, ("latitude", "longitude"))
+    return (
+        Event.update(
+            latitude=Address.select(Address.latitude).where(
+                Address.id == Event.address
+            ),
+            longitude=Address.select(Address.longitude).where(
+                Address.id == Event.address
+            ),
+        )
+        .where(Event.latitude.is_null() | Event.longitude.is_null())
+        .execute()
+    )
+
+
+def event_revisions():
+    """Adds the event revisions used in feed ETags."""
+
+    return _add_columns(Event, Event.revision)
+
+
+def event_restores():
+    """Adds the restore dates that exempt restored events from archival."""
+
+    return _add_columns(Event, Event.restored)
+
+
+def price_summaries():
+    """Computes the price summaries of existing prices."""
+
+    return PriceSummary.backfill()
+
+
+MIGRATIONS = [event_coordinates, event_revisions, event_restores, price_summaries]
+
+
+def run():
+    """Creates missing tables and runs all migrations."""
+
+    create_tables(fail_silently=True)
+
+    for migration in MIGRATIONS:
+        with DATABASE.atomic():
+            LOGGER.info("Migration %s: %s changes.", migration.__name__, migration())
+
+
+def main():
+    """Migrates the database."""
+
+    basicConfig(level=INFO, format="[%(levelname)s] %(name)s: %(message)s")
+
+    with DATABASE.connection_context():
+        run()
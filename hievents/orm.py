@@ -1,42 +1,68 @@
 """ORM models."""
 
-from datetime import datetime
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from enum import Enum
+from hashlib import sha256
+from json import dumps, loads
 from uuid import uuid4
 
 from peewee import CharField
 from peewee import DateField
 from peewee import DateTimeField
 from peewee import DecimalField
+from peewee import FloatField
 from peewee import ForeignKeyField
+from peewee import IntegerField
+from peewee import IntegrityError
 from peewee import TextField
 from peewee import UUIDField
+from peewee import fn
 
 from filedb import File
 from hinews.exceptions import InvalidCustomer, InvalidTag
-from hinews.watermark import watermark
 from his.orm import Account
 from mdb import Address, Customer
-from peeweeplus import EnumField, JSONModel, MySQLDatabaseProxy
+from peeweeplus import EnumField, JSONModel
+
+from hievents.database import get_database, get_schema
 
 
 __all__ = [
     "create_tables",
+    "customer_events",
+    "events_to_json",
+    "json_rows",
+    "Currency",
     "Event",
     "Editor",
     "Image",
+    "ImageFile",
     "TagList",
     "CustomerList",
     "Tag",
     "SubEvent",
     "Price",
+    "PriceSummary",
     "EventCustomer",
     "AccessToken",
+    "JobState",
+    "Job",
+    "ArchivedEvent",
+    "ArchivedEditor",
+    "ArchivedImage",
+    "ArchivedTag",
+    "ArchivedSubEvent",
+    "ArchivedPrice",
+    "ArchivedEventCustomer",
+    "ARCHIVES",
     "MODELS",
 ]
 
 
-DATABASE = MySQLDatabaseProxy("hievents")
+DATABASE = get_database("hievents")
+EDIT_WINDOW = timedelta(minutes=15)
 
 
 def create_tables(fail_silently=False):
@@ -55,6 +81,28 @@ def event_active():
     )
 
 
+def customer_events(customer):
+    """Returns a query of the customer's active events."""
+
+    return (
+        Event.select(cascade=True)
+        .join(EventCustomer)
+        .where(event_active() & (EventCustomer.customer == customer))
+    )
+
+
+def _oneliner(source):
+    """Returns the image source text as a one-liner."""
+
+    return " ".join((source or "").split("\n"))
+
+
+def _watermark_etag(sha256sum, source):
+    """Returns an ETag for the watermarked image of the file and source."""
+
+    return sha256(f"{sha256sum}:{_oneliner(source)}".encode()).hexdigest()
+
+
 class Currency(Enum):
     """Available currencies."""
 
@@ -83,7 +131,7 @@ class EventsModel(JSONModel):
         """Configures the database and schema."""
 
         database = DATABASE
-        schema = database.database
+        schema = get_schema(database)
 
 
 class Event(EventsModel):
@@ -97,6 +145,18 @@ class Event(EventsModel):
     begin = DateField()
     end = DateField(null=True)
     active_until = DateField(null=True)
+    # Copied from the address on save for proximity searches.
+    latitude = FloatField(null=True)
+    longitude = FloatField(null=True)
+    # Bumped on every change of the event or its relations.
+    revision = IntegerField(default=0)
+    # Date of the last restore from the archive, see archive.expired().
+    restored = DateField(null=True)
+
+    class Meta:
+        """Sets the index for proximity searches."""
+
+        indexes = ((("latitude", "longitude"), False),)
 
     @classmethod
     def from_json(cls, author, dictionary, **kwargs):
@@ -105,10 +165,30 @@ class Event(EventsModel):
         event.author = author
         return event
 
+    @classmethod
+    def select(cls, *args, cascade=False, **kwargs):
+        """Selects events, optionally joining their author and address."""
+        if not cascade:
+            return super().select(*args, **kwargs)
+
+        args = (cls, Account, Address, *args)
+        return (
+            super()
+            .select(*args, **kwargs)
+            .join(Account)
+            .switch(cls)
+            .join(Address)
+            .switch(cls)
+        )
+
     @property
     def editors(self):
-        """Yields event editors."""
-        return Editor.select().where(Editor.event == self)
+        """Yields event editors, latest first."""
+        return (
+            Editor.select()
+            .where(Editor.event == self)
+            .order_by(Editor.timestamp.desc())
+        )
 
     @property
     def images(self):
@@ -135,27 +215,60 @@ class Event(EventsModel):
         """Yield the respective prices."""
         return Price.select().where(Price.event == self)
 
-    def to_json(self, *args, **kwargs):
-        """Returns a JSON-ish dictionary."""
+    def to_json(self, *args, relations=None, **kwargs):
+        """Returns a JSON-ish dictionary.
+
+        Pass batch-loaded relations to avoid per-event queries.
+        """
+        if relations is None:
+            relations = EventRelations([self])
+
         dictionary = super().to_json(*args, **kwargs)
         dictionary.update(
             {
                 "author": self.author.info,
                 "address": self.address.to_json(),
-                "editors": [editor.id for editor in self.editors],
-                "images": [image.id for image in self.images],
-                "tags": [tag.id for tag in self.tags],
-                "customers": [customer.id for customer in self.customers],
-                "sub_events": [sub_event.id for sub_event in self.sub_events],
-                "prices": [price.id for price in self.prices],
+                **relations.to_json(self),
             }
         )
         return dictionary
 
+    @classmethod
+    def bump_revision(cls, event):
+        """Increments the revision of the respective event."""
+        return (
+            cls.update(revision=cls.revision + 1).where(cls.id == event).execute()
+        )
+
+    def save(self, *args, **kwargs):
+        """Saves the event with its address' coordinates.
+
+        The revision is never written back, but bumped in SQL,
+        so that concurrent saves cannot end up with one revision.
+        """
+        self.latitude = self.address.latitude
+        self.longitude = self.address.longitude
+
+        if self.id is not None and kwargs.get("only") is None:
+            kwargs["only"] = [
+                field
+                for field in self._meta.sorted_fields
+                if field is not Event.revision
+            ]
+
+        with DATABASE.atomic():
+            result = super().save(*args, **kwargs)
+            Event.bump_revision(self.id)
+            self.revision = (
+                Event.select(Event.revision).where(Event.id == self.id).scalar()
+            )
+
+        return result
+
     def delete_instance(self, recursive=False, delete_nullable=False):
         """Deletes the event."""
         # Manually delete all referencing images to ensure
-        # deletion of the respective filedb entries.
+        # release of the respective filedb entries.
         for image in self.images:
             image.delete_instance()
 
@@ -164,21 +277,101 @@ class Event(EventsModel):
         )
 
 
-class Editor(EventsModel):
+class EventRelatedModel(EventsModel):
+    """A model related to an event.
+
+    Changes bump the event's revision.
+    """
+
+    def save(self, *args, **kwargs):
+        """Saves the record and bumps the event's revision."""
+        with DATABASE.atomic():
+            result = super().save(*args, **kwargs)
+            Event.bump_revision(self.event_id)
+
+        return result
+
+    def delete_instance(self, *args, **kwargs):
+        """Deletes the record and bumps the event's revision."""
+        with DATABASE.atomic():
+            result = super().delete_instance(*args, **kwargs)
+            Event.bump_revision(self.event_id)
+
+        return result
+
+    @classmethod
+    def bulk_patch(cls, event, patches, batch_size=100):
+        """Applies partial updates, each identified by its "id",
+        to records of the event with batched UPDATE statements.
+
+        Unlike save(), this neither bumps the event's revision nor
+        runs other save hooks, so callers must do so once.
+        """
+        idents = [patch.get("id") for patch in patches]
+        records = {
+            record.id: record
+            for record in cls.select().where(
+                (cls.event == event) & cls.id.in_(idents)
+            )
+        }
+        fields = set()
+
+        for patch in patches:
+            patch = dict(patch)
+
+            try:
+                record = records[patch.pop("id", None)]
+            except KeyError:
+                raise cls.DoesNotExist() from None
+
+            record.patch_json(patch, fk_fields=False)
+            fields.update(record.dirty_fields)
+
+        if fields:
+            cls.bulk_update(records.values(), fields=fields, batch_size=batch_size)
+
+        return list(records.values())
+
+
+class Editor(EventRelatedModel):
     """An event's editor."""
 
     class Meta:
         """Sets the table name."""
 
         table_name = "event_editor"
+        indexes = ((("event", "timestamp"), False),)
 
     event = ForeignKeyField(Event, column_name="event", on_delete="CASCADE")
     account = ForeignKeyField(Account, column_name="account", on_delete="CASCADE")
     timestamp = DateTimeField(default=datetime.now)
 
     @classmethod
-    def add(cls, event, account):
-        """Adds a new author record to the respective event."""
+    def add(cls, event, account, window=EDIT_WINDOW):
+        """Adds a new author record to the respective event.
+
+        Edits of the same account within the time window
+        are coalesced into the account's latest record.
+        """
+        now = datetime.now()
+
+        try:
+            event_editor = (
+                cls.select()
+                .where(
+                    (cls.event == event)
+                    & (cls.account == account)
+                    & (cls.timestamp >= now - window)
+                )
+                .order_by(cls.timestamp.desc())
+                .get()
+            )
+        except cls.DoesNotExist:
+            pass
+        else:
+            event_editor.timestamp = now
+            return event_editor
+
         event_editor = cls()
         event_editor.event = event
         event_editor.account = account
@@ -191,7 +384,7 @@ class Editor(EventsModel):
         return dictionary
 
 
-class Image(EventsModel):
+class Image(EventRelatedModel):
     """An image of an event."""
 
     class Meta:
@@ -206,38 +399,204 @@ class Image(EventsModel):
     source = TextField(null=True)
 
     @classmethod
-    def add(cls, event, bytes_, metadata, account):
-        """Adds the respective image data to the event."""
+    def add(cls, event, image_file, metadata, account):
+        """Adds the respective image file to the event.
+
+        Images with identical content share one stored file.
+        """
         event_image = cls()
         event_image.event = event
         event_image.account = account
-        event_image.file = File.from_bytes(bytes_)
         event_image.source = metadata["source"]
+        event_image.file = image_file.file_id
         return event_image
 
+    @classmethod
+    def select(cls, *args, cascade=False, **kwargs):
+        """Selects images, optionally joining their account
+        and the metadata columns, but not the content, of their file.
+        """
+        if not cascade:
+            return super().select(*args, **kwargs)
+
+        args = (cls, Account, File.id, File.mimetype, File.size, File.sha256sum, *args)
+        return (
+            super()
+            .select(*args, **kwargs)
+            .join(Account)
+            .switch(cls)
+            .join(File)
+            .switch(cls)
+        )
+
     @property
     def oneliner(self):
         """Returns the source text as a one-liner."""
-        return " ".join(self.source.split("\n"))
+        return _oneliner(self.source)
 
     @property
     def watermarked(self):
         """Returns a watermarked image."""
+        # Lazy import, since the watermark stack pulls in PIL.
+        from hinews.watermark import watermark  # pylint: disable=C0415
+
         return watermark(self.file.bytes, f"Quelle: {self.oneliner}")
 
+    @property
+    def sha256sum(self):
+        """Returns the file's SHA-256 checksum without loading its content."""
+        return File.select(File.sha256sum).where(File.id == self.file_id).scalar()
+
+    @property
+    def watermark_etag(self):
+        """Returns an ETag for the watermarked image."""
+        return _watermark_etag(self.sha256sum, self.source)
+
+    @classmethod
+    def watermark_etags(cls, event_ids):
+        """Returns the watermark ETags per image ID per event ID."""
+        images = list(
+            cls.select(cls.id, cls.event, cls.file, cls.source)
+            .where(cls.event.in_(event_ids))
+            .tuples()
+        )
+        # Files may live in another database, so they are not joined.
+        checksums = dict(
+            File.select(File.id, File.sha256sum)
+            .where(File.id.in_({file for _, _, file, _ in images}))
+            .tuples()
+        )
+        etags = defaultdict(dict)
+
+        for ident, event, file, source in images:
+            etags[event][ident] = _watermark_etag(checksums.get(file), source)
+
+        return etags
+
     def patch_json(self, dictionary):
         """Patches the image metadata with the respective dictionary."""
         return super().patch_json(dictionary, skip=("uploaded",), fk_fields=False)
 
+    def delete_instance(self, *args, **kwargs):
+        """Deletes the image and releases its file."""
+        with DATABASE.atomic():
+            result = super().delete_instance(*args, **kwargs)
+            ImageFile.release(self.file_id)
+
+        return result
+
     def to_json(self):
-        """Returns a JSON-compliant integer."""
+        """Returns a JSON-ish dictionary with the file's metadata.
+
+        Select images with cascade=True to avoid loading
+        the account and the file for each image.
+        """
         dictionary = super().to_json()
         dictionary["account"] = self.account.info
         dictionary["mimetype"] = self.file.mimetype
+        dictionary["size"] = self.file.size
+        dictionary["sha256sum"] = self.file.sha256sum
         return dictionary
 
 
-class Tag(EventsModel):
+class ImageFile(EventsModel):
+    """A stored image file, shared by all images with the same content."""
+
+    class Meta:
+        """Sets the table name."""
+
+        table_name = "image_file"
+
+    file = ForeignKeyField(File, column_name="file", unique=True)
+    sha256sum = CharField(64, unique=True)
+    references = IntegerField(default=0)
+
+    @classmethod
+    def acquire(cls, bytes_):
+        """Returns the image file of the respective content
+        and increments its reference count.
+
+        The content is only stored if it is not yet known. Call this
+        outside of transactions, so that image files stored by
+        concurrent requests are visible.
+        """
+        sha256sum = sha256(bytes_).hexdigest()
+
+        while True:
+            try:
+                image_file = cls.get(cls.sha256sum == sha256sum)
+            except cls.DoesNotExist:
+                # Retry if another request stored the content concurrently.
+                if (image_file := cls._create(bytes_, sha256sum)) is None:
+                    continue
+
+            # Zero rows are updated if the file was released concurrently.
+            if (
+                cls.update(references=cls.references + 1)
+                .where(cls.id == image_file.id)
+                .execute()
+            ):
+                return image_file
+
+    @classmethod
+    @contextmanager
+    def acquired(cls, bytes_):
+        """Acquires the image file of the respective content
+        and releases it again if the block fails.
+        """
+        image_file = cls.acquire(bytes_)
+
+        try:
+            yield image_file
+        except BaseException:
+            cls.release(image_file.file_id)
+            raise
+
+    @classmethod
+    def _create(cls, bytes_, sha256sum):
+        """Stores the content as a new image file.
+
+        Returns None if another request stored it concurrently.
+        The stored file is deleted again on any failure.
+        """
+        file = File.from_bytes(bytes_)
+        file.save()
+        image_file = cls(file=file, sha256sum=sha256sum)
+
+        try:
+            with DATABASE.atomic():
+                image_file.save()
+        except IntegrityError:
+            file.delete_instance()
+            return None
+        except BaseException:
+            file.delete_instance()
+            raise
+
+        return image_file
+
+    @classmethod
+    def release(cls, file):
+        """Decrements the reference count of the respective file
+        and schedules its deletion when the last reference is gone.
+        """
+        try:
+            image_file = cls.get(cls.file == file)
+        except cls.DoesNotExist:  # Image stored before deduplication.
+            Job.enqueue("delete_file", key=f"delete_file:{file}", file=file)
+            return
+
+        cls.update(references=cls.references - 1).where(
+            cls.id == image_file.id
+        ).execute()
+
+        if cls.delete().where(
+            (cls.id == image_file.id) & (cls.references <= 0)
+        ).execute():
+            Job.enqueue("delete_file", key=f"delete_file:{file}", file=file)
+
+
+class Tag(EventRelatedModel):
     """Tags for events."""
 
     class Meta:
@@ -266,7 +625,7 @@ class Tag(EventsModel):
             return event_tag
 
 
-class SubEvent(EventsModel):
+class SubEvent(EventRelatedModel):
     """A sub-event."""
 
     class Meta:
@@ -288,7 +647,7 @@ class SubEvent(EventsModel):
         return sub_event
 
 
-class Price(EventsModel):
+class Price(EventRelatedModel):
     """Price of an event."""
 
     event = ForeignKeyField(Event, column_name="event", on_delete="CASCADE")
@@ -306,8 +665,80 @@ class Price(EventsModel):
         price.caption = caption
         return price
 
+    def save(self, *args, **kwargs):
+        """Saves the price and refreshes the event's price summaries."""
+        with DATABASE.atomic():
+            result = super().save(*args, **kwargs)
+            PriceSummary.refresh(self.event_id)
+
+        return result
+
+    def delete_instance(self, *args, **kwargs):
+        """Deletes the price and refreshes the event's price summaries."""
+        with DATABASE.atomic():
+            result = super().delete_instance(*args, **kwargs)
+            PriceSummary.refresh(self.event_id)
+
+        return result
+
+
+class PriceSummary(EventsModel):
+    """Price range of an event per currency."""
+
+    class Meta:
+        """Sets the table name and indexes for price filters."""
+
+        table_name = "price_summary"
+        indexes = (
+            (("event", "currency"), True),
+            (("currency", "minimum"), False),
+            (("minimum",), False),
+        )
+
+    event = ForeignKeyField(Event, column_name="event", on_delete="CASCADE")
+    currency = EnumField(Currency)
+    minimum = DecimalField(6, 2)
+    maximum = DecimalField(6, 2)
+
+    @classmethod
+    def _insert(cls, condition):
+        """Inserts the summaries of the prices matching the condition."""
+        return cls.insert_from(
+            Price.select(
+                Price.event,
+                Price.currency,
+                fn.MIN(Price.value),
+                fn.MAX(Price.value),
+            )
+            .where(condition)
+            .group_by(Price.event, Price.currency),
+            [cls.event, cls.currency, cls.minimum, cls.maximum],
+        ).execute()
+
+    @classmethod
+    def refresh(cls, event):
+        """Recomputes the price summaries of the respective event."""
+        with DATABASE.atomic():
+            cls.delete().where(cls.event == event).execute()
+            cls._insert(Price.event == event)
+
+    @classmethod
+    def backfill(cls):
+        """Computes the price summaries of all events without any."""
+        return cls._insert(Price.event.not_in(cls.select(cls.event)))
+
+    def to_json(self):
+        """Returns a JSON-ish dictionary with formatted prices."""
+        return {
+            "currency": self.currency.name,
+            "min": float(self.minimum),
+            "max": float(self.maximum),
+            "from": self.currency.format(self.minimum),
+            "to": self.currency.format(self.maximum),
+        }
+
 
-class EventCustomer(EventsModel):
+class EventCustomer(EventRelatedModel):
     """Customer <> Event mappings."""
 
     class Meta:
@@ -336,7 +767,7 @@ class EventCustomer(EventsModel):
 
     def to_json(self):
         """Returns a JSON-ish representation of the event customer."""
-        return {"id": self.id, "customer": self.customer.id}
+        return {"id": self.id, "customer": self.customer_id}
 
 
 class CustomerList(EventsModel):
@@ -401,15 +832,402 @@ class AccessToken(EventsModel):
             return access_token
 
 
+class JobState(Enum):
+    """States of background jobs."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class Job(EventsModel):
+    """A background job, run by the worker process."""
+
+    class Meta:
+        """Sets the table name and the index for claiming due jobs."""
+
+        table_name = "job"
+        indexes = ((("state", "run_after"), False),)
+
+    name = CharField(64)
+    # Unique while pending to deduplicate jobs, cleared when claimed.
+    key = CharField(255, null=True, unique=True)
+    arguments = TextField(default="{}")
+    state = EnumField(JobState, default=JobState.PENDING)
+    attempts = IntegerField(default=0)
+    max_attempts = IntegerField(default=5)
+    created = DateTimeField(default=datetime.now)
+    run_after = DateTimeField(default=datetime.now)
+    started = DateTimeField(null=True)
+    finished = DateTimeField(null=True)
+    error = TextField(null=True)
+
+    @classmethod
+    def enqueue(cls, name, key=None, delay=timedelta(), **arguments):
+        """Enqueues a job unless a pending job with the same key exists."""
+        job = cls(
+            name=name,
+            key=key,
+            arguments=dumps(arguments),
+            run_after=datetime.now() + delay,
+        )
+
+        try:
+            with DATABASE.atomic():
+                job.save()
+        except IntegrityError:
+            try:
+                return cls.get(cls.key == key)
+            except cls.DoesNotExist:  # Claimed in the meantime.
+                return cls.enqueue(name, key=key, delay=delay, **arguments)
+
+        return job
+
+    @classmethod
+    def claim(cls, candidates=10):
+        """Claims the next due job or returns None."""
+        now = datetime.now()
+
+        for job in (
+            cls.select(cls.id)
+            .where((cls.state == JobState.PENDING) & (cls.run_after <= now))
+            .order_by(cls.run_after)
+            .limit(candidates)
+        ):
+            if (
+                cls.update(
+                    state=JobState.RUNNING,
+                    key=None,
+                    started=now,
+                    attempts=cls.attempts + 1,
+                )
+                .where((cls.id == job.id) & (cls.state == JobState.PENDING))
+                .execute()
+            ):
+                return cls.get_by_id(job.id)
+
+        return None
+
+    @classmethod
+    def requeue_stale(cls, timeout):
+        """Requeues running jobs of crashed workers.
+
+        Jobs that have used up their attempts, e.g. because
+        they crash the worker, are marked as failed instead.
+        """
+        now = datetime.now()
+        stale = (cls.state == JobState.RUNNING) & (cls.started < now - timeout)
+        cls.update(
+            state=JobState.FAILED, finished=now, error="Worker did not finish."
+        ).where(stale & (cls.attempts >= cls.max_attempts)).execute()
+        return cls.update(state=JobState.PENDING).where(stale).execute()
+
+    @classmethod
+    def prune(cls, retention):
+        """Deletes jobs finished longer than the retention period ago."""
+        return (
+            cls.delete()
+            .where(
+                cls.state.in_([JobState.DONE, JobState.FAILED])
+                & (cls.finished < datetime.now() - retention)
+            )
+            .execute()
+        )
+
+    @property
+    def kwargs(self):
+        """Returns the job's keyword arguments."""
+        return loads(self.arguments)
+
+    def succeed(self):
+        """Marks the job as done."""
+        self.state = JobState.DONE
+        self.finished = datetime.now()
+        self.error = None
+        self.save()
+
+    def fail(self, error, backoff=timedelta(seconds=30)):
+        """Schedules a retry with exponential backoff or marks the job as failed."""
+        self.error = error
+
+        if self.attempts < self.max_attempts:
+            self.state = JobState.PENDING
+            self.run_after = datetime.now() + backoff * 2 ** (self.attempts - 1)
+        else:
+            self.state = JobState.FAILED
+            self.finished = datetime.now()
+
+        self.save()
+
+
+class ArchivedEvent(EventsModel):
+    """An expired event, moved out of the hot tables."""
+
+    class Meta:
+        """Sets the table name."""
+
+        table_name = "archived_event"
+
+    id = IntegerField(primary_key=True)
+    author = ForeignKeyField(Account, column_name="author")
+    created = DateTimeField()
+    title = CharField(255)
+    subtitle = CharField(255, null=True)
+    address = ForeignKeyField(Address, column_name="address")
+    begin = DateField()
+    end = DateField(null=True)
+    active_until = DateField(null=True)
+    latitude = FloatField(null=True)
+    longitude = FloatField(null=True)
+    revision = IntegerField()
+    archived = DateTimeField(default=datetime.now)
+
+    def to_json(self, *args, relations=True, **kwargs):
+        """Returns a JSON-ish dictionary, optionally with the relations."""
+        dictionary = super().to_json(*args, **kwargs)
+
+        if relations:
+            for key, model in ARCHIVED_RELATIONS.items():
+                dictionary[key] = [
+                    record.to_json()
+                    for record in model.select().where(model.event == self)
+                ]
+
+        return dictionary
+
+
+class ArchivedEditor(EventsModel):
+    """An editor of an archived event."""
+
+    class Meta:
+        """Sets the table name."""
+
+        table_name = "archived_event_editor"
+
+    id = IntegerField(primary_key=True)
+    event = ForeignKeyField(ArchivedEvent, column_name="event", on_delete="CASCADE")
+    account = ForeignKeyField(Account, column_name="account", on_delete="CASCADE")
+    timestamp = DateTimeField()
+
+
+class ArchivedImage(EventsModel):
+    """An image of an archived event.
+
+    The image keeps its reference to the shared image file.
+    """
+
+    class Meta:
+        """Sets the table name."""
+
+        table_name = "archived_image"
+
+    id = IntegerField(primary_key=True)
+    event = ForeignKeyField(ArchivedEvent, column_name="event", on_delete="CASCADE")
+    account = ForeignKeyField(Account, column_name="account", on_delete="CASCADE")
+    file = ForeignKeyField(File, column_name="file")
+    uploaded = DateTimeField()
+    source = TextField(null=True)
+
+
+class ArchivedTag(EventsModel):
+    """A tag of an archived event."""
+
+    class Meta:
+        """Sets the table name."""
+
+        table_name = "archived_event_tag"
+
+    id = IntegerField(primary_key=True)
+    event = ForeignKeyField(ArchivedEvent, column_name="event", on_delete="CASCADE")
+    tag = CharField(255)
+
+
+class ArchivedSubEvent(EventsModel):
+    """A sub-event of an archived event."""
+
+    class Meta:
+        """Sets the table name."""
+
+        table_name = "archived_sub_event"
+
+    id = IntegerField(primary_key=True)
+    event = ForeignKeyField(ArchivedEvent, column_name="event", on_delete="CASCADE")
+    timestamp = DateTimeField()
+    caption = CharField(255, null=True)
+
+
+class ArchivedPrice(EventsModel):
+    """A price of an archived event."""
+
+    class Meta:
+        """Sets the table name."""
+
+        table_name = "archived_price"
+
+    id = IntegerField(primary_key=True)
+    event = ForeignKeyField(ArchivedEvent, column_name="event", on_delete="CASCADE")
+    value = DecimalField(6, 2)
+    currency = EnumField(Currency)
+    caption = CharField(255, null=True)
+
+
+class ArchivedEventCustomer(EventsModel):
+    """A customer of an archived event."""
+
+    class Meta:
+        """Sets the table name."""
+
+        table_name = "archived_event_customer"
+
+    id = IntegerField(primary_key=True)
+    event = ForeignKeyField(ArchivedEvent, column_name="event", on_delete="CASCADE")
+    customer = ForeignKeyField(Customer, column_name="customer", on_delete="CASCADE")
+
+
+# Hot models and their archive models, parents first.
+ARCHIVES = (
+    (Event, ArchivedEvent),
+    (Editor, ArchivedEditor),
+    (Image, ArchivedImage),
+    (Tag, ArchivedTag),
+    (SubEvent, ArchivedSubEvent),
+    (Price, ArchivedPrice),
+    (EventCustomer, ArchivedEventCustomer),
+)
+ARCHIVED_RELATIONS = {
+    "editors": ArchivedEditor,
+    "images": ArchivedImage,
+    "tags": ArchivedTag,
+    "sub_events": ArchivedSubEvent,
+    "prices": ArchivedPrice,
+    "customers": ArchivedEventCustomer,
+}
+
+
+class EventRelations:
+    """Relations of multiple events, loaded in a fixed number of queries."""
+
+    def __init__(self, events):
+        ids = [event.id for event in events]
+        self.editors = dict(
+            Editor.select(Editor.event, fn.COUNT(Editor.id))
+            .where(Editor.event.in_(ids))
+            .group_by(Editor.event)
+            .tuples()
+        )
+        self.last_editors = _last_editors(ids)
+        self.images = _relation_ids(Image, ids)
+        self.image_versions = Image.watermark_etags(ids)
+        self.tags = _relation_ids(Tag, ids)
+        self.customers = _relation_ids(EventCustomer, ids)
+        self.sub_events = _relation_ids(SubEvent, ids)
+        self.prices = _relation_ids(Price, ids)
+        self.price_summaries = defaultdict(list)
+
+        for price_summary in PriceSummary.select().where(
+            PriceSummary.event.in_(ids)
+        ):
+            self.price_summaries[price_summary.event_id].append(price_summary)
+
+    def to_json(self, event):
+        """Returns a JSON-ish dictionary of the event's relations."""
+        last_editor = self.last_editors.get(event.id)
+        return {
+            "editors": self.editors.get(event.id, 0),
+            "last_editor": None if last_editor is None else last_editor.to_json(),
+            "images": self.images[event.id],
+            "image_versions": self.image_versions[event.id],
+            "tags": self.tags[event.id],
+            "customers": self.customers[event.id],
+            "sub_events": self.sub_events[event.id],
+            "prices": self.prices[event.id],
+            "price_summaries": [
+                price_summary.to_json()
+                for price_summary in self.price_summaries[event.id]
+            ],
+        }
+
+
+def _relation_ids(model, event_ids):
+    """Returns the IDs of the model's records per event ID."""
+
+    relation_ids = defaultdict(list)
+
+    for ident, event in (
+        model.select(model.id, model.event).where(model.event.in_(event_ids)).tuples()
+    ):
+        relation_ids[event].append(ident)
+
+    return relation_ids
+
+
+def _last_editors(event_ids):
+    """Returns the latest editor per event ID."""
+
+    latest = (
+        Editor.select(Editor.event, fn.MAX(Editor.timestamp).alias("timestamp"))
+        .where(Editor.event.in_(event_ids))
+        .group_by(Editor.event)
+    )
+    return {
+        editor.event_id: editor
+        for editor in Editor.select(Editor, Account)
+        .join(
+            latest,
+            on=(
+                (Editor.event == latest.c.event)
+                & (Editor.timestamp == latest.c.timestamp)
+            ),
+        )
+        .switch(Editor)
+        .join(Account)
+    }
+
+
+def events_to_json(events):
+    """Returns JSON-ish dictionaries of the given events
+    with their relations loaded in a fixed number of queries.
+    """
+
+    events = list(events)
+    relations = EventRelations(events)
+    return [event.to_json(relations=relations) for event in events]
+
+
+def json_rows(query):
+    """Returns JSON-ish dictionaries of the query's column projection.
+
+    Rows are not hydrated into model instances and null values are
+    omitted like JSONModel.to_json() does. Values like decimals,
+    dates and enums are left to the JSON encoder.
+    """
+
+    return [
+        {key: value for key, value in row.items() if value is not None}
+        for row in query.dicts().iterator()
+    ]
+
+
 MODELS = [
     Event,
     Editor,
     Image,
+    ImageFile,
     TagList,
     CustomerList,
     Tag,
     SubEvent,
     Price,
+    PriceSummary,
     EventCustomer,
     AccessToken,
+    Job,
+    ArchivedEvent,
+    ArchivedEditor,
+    ArchivedImage,
+    ArchivedTag,
+    ArchivedSubEvent,
+    ArchivedPrice,
+    ArchivedEventCustomer,
 ]
@@ -0,0 +1,56 @@
+"""Coalescing of concurrent identical computations."""
+
+from threading import Event, Lock
+
+__all__ = ["SingleFlight"]
+
+
+class _Call:
+    """A computation in flight."""
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs a computation once per key for all concurrent callers.
+
+    Callers arriving while the computation is in flight wait for it
+    and share its result or exception. Results are not retained.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.calls = {}
+
+    def do(self, key, function, *args, **kwargs):
+        """Returns the result of the function for the key."""
+        with self.lock:
+            if (call := self.calls.get(key)) is None:
+                call = self.calls[key] = _Call()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            call.done.wait()
+
+            if call.error is not None:
+                raise call.error
+
+            return call.result
+
+        try:
+            call.result = function(*args, **kwargs)
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+
+            call.done.set()
+
+        return call.result
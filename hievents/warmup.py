@@ -0,0 +1,124 @@
+"""Cache warm-up after deployments or cache flushes."""
+
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from logging import INFO, basicConfig, getLogger
+from time import perf_counter
+
+from mdb import Customer
+
+from hievents.feeds import CUSTOMER_FEEDS, prerender
+from hievents.images import watermarked
+from hievents.orm import DATABASE, AccessToken, Image
+
+__all__ = ["warm_up", "main"]
+
+
+WORKERS = 4
+PROGRESS = 100
+LOGGER = getLogger("hievents.warmup")
+
+
+def _customers():
+    """Yields all customers with an access token."""
+
+    return (
+        Customer.select()
+        .join(AccessToken, on=AccessToken.customer == Customer.id)
+        .distinct()
+    )
+
+
+def _render_feed(kind, customer):
+    """Renders the customer's feed on a thread's own connection."""
+
+    with DATABASE.connection_context():
+        prerender(kind, customer)
+
+
+def _render_image(image):
+    """Renders the watermarked image on a thread's own connection."""
+
+    with DATABASE.connection_context():
+        watermarked(image)
+
+
+def _tasks(feeds=True, images=True):
+    """Returns the warm-up tasks as (description, function, *args)."""
+
+    tasks = []
+
+    if feeds:
+        for customer in _customers():
+            for kind in CUSTOMER_FEEDS:
+                description = f"{kind} feed of customer #{customer.id}"
+                tasks.append((description, _render_feed, kind, customer))
+
+    if images:
+        for image in Image.select(Image.id, Image.file, Image.source):
+            tasks.append((f"image #{image.id}", _render_image, image))
+
+    return tasks
+
+
+def warm_up(workers=WORKERS, feeds=True, images=True):
+    """Renders the public feeds and watermarked images with
+    bounded parallelism and returns the number of failures.
+    """
+
+    start = perf_counter()
+
+    with DATABASE.connection_context():
+        tasks = _tasks(feeds=feeds, images=images)
+
+    LOGGER.info("Warming up %i entries with %i workers.", len(tasks), workers)
+    failures = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(function, *args): description
+            for description, function, *args in tasks
+        }
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                future.result()
+            except Exception:  # pylint: disable=W0703
+                failures += 1
+                LOGGER.exception("Could not render %s.", futures[future])
+
+            if done % PROGRESS == 0 or done == len(tasks):
+                LOGGER.info(
+                    "%i/%i done after %.1f s.", done, len(tasks), perf_counter() - start
+                )
+
+    LOGGER.info(
+        "Warmed up %i entries in %.1f s, %i failed.",
+        len(tasks) - failures,
+        perf_counter() - start,
+        failures,
+    )
+    return failures
+
+
+def get_args():
+    """Parses the command line arguments."""
+
+    parser = ArgumentParser(description="Warms up the hievents caches.")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=WORKERS, help="parallel renderings"
+    )
+    parser.add_argument("--no-feeds", action="store_true", help="skip public feeds")
+    parser.add_argument("--no-images", action="store_true", help="skip images")
+    return parser.parse_args()
+
+
+def main():
+    """Runs the warm-up."""
+
+    args = get_args()
+    basicConfig(level=INFO, format="[%(levelname)s] %(name)s: %(message)s")
+    failures = warm_up(
+        workers=args.workers, feeds=not args.no_feeds, images=not args.no_images
+    )
+    return 1 if failures else 0
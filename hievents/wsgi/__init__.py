@@ -1,8 +1,19 @@
 """WSGI application."""
 
+from flask import request
+
 from wsgilib import Application
 
-from hievents.wsgi import customer, event, image, price, public, sub_event, tag
+from hievents.database import release
+from hievents.orm import DATABASE
+from hievents.wsgi import archive, batch, customer, event, health, image, job
+from hievents.wsgi import price, profiling, public, sub_event, tag
+
+__all__ = ["APPLICATION"]
+
+
+CONNECTED = "hievents.connected"
+
 
 APPLICATION = Application("hievents", debug=True)
 APPLICATION.add_routes(
@@ -13,4 +24,31 @@ APPLICATION.add_routes(
     + public.ROUTES
     + sub_event.ROUTES
     + tag.ROUTES
+    + batch.ROUTES
+    + health.ROUTES
+    + job.ROUTES
+    + archive.ROUTES
 )
+
+
+@APPLICATION.before_request
+def connect():
+    """Checks out a database connection for the request."""
+
+    DATABASE.connect(reuse_if_open=True)
+    request.environ[CONNECTED] = True
+
+
+@APPLICATION.teardown_request
+def disconnect(_):
+    """Returns the request's pooled database connections, even on errors.
+
+    Nested request contexts, e.g. of batch sub-requests,
+    leave the connection to the outer request.
+    """
+
+    if request.environ.get(CONNECTED):
+        release(DATABASE)
+
+
+profiling.init(APPLICATION)
@@ -0,0 +1,75 @@
+"""Read-only access to and restoring of archived events."""
+
+from flask import request
+
+from his import authenticated, authorized
+
+from hievents.archive import restore
+from hievents.jobs import enqueue_feed_rebuilds
+from hievents.messages.archive import NoSuchArchivedEvent, EventRestored
+from hievents.orm import ArchivedEvent
+from hievents.wsgi.responses import FastJSON
+from hievents.wsgi.routing import read_only, writes
+
+__all__ = ["ROUTES"]
+
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def _get_archived_event(ident):
+    """Returns the respective archived event."""
+
+    try:
+        return ArchivedEvent.get(ArchivedEvent.id == ident)
+    except ArchivedEvent.DoesNotExist:
+        raise NoSuchArchivedEvent()
+
+
+@authenticated
+@authorized("hievents")
+@read_only
+def list_():
+    """Lists a page of archived events, latest archived first."""
+
+    page = max(request.args.get("page", 1, type=int), 1)
+    size = request.args.get("size", PAGE_SIZE, type=int)
+    size = min(max(size, 1), MAX_PAGE_SIZE)
+    events = (
+        ArchivedEvent.select()
+        .order_by(ArchivedEvent.archived.desc(), ArchivedEvent.id.desc())
+        .paginate(page, size)
+    )
+    return FastJSON([event.to_json(relations=False) for event in events])
+
+
+@authenticated
+@authorized("hievents")
+@read_only
+def get(ident):
+    """Returns the respective archived event with its relations."""
+
+    return FastJSON(_get_archived_event(ident).to_json())
+
+
+@authenticated
+@authorized("hievents")
+@writes
+def post_restore(ident):
+    """Restores the respective archived event."""
+
+    try:
+        event = restore(ident)
+    except ArchivedEvent.DoesNotExist:
+        raise NoSuchArchivedEvent()
+
+    enqueue_feed_rebuilds(event)
+    return EventRestored()
+
+
+ROUTES = (
+    ("GET", "/archive/event", list_, "list_archived_events"),
+    ("GET", "/archive/event/<int:ident>", get, "get_archived_event"),
+    ("POST", "/archive/event/<int:ident>/restore", post_restore, "restore_event"),
+)
@@ -0,0 +1,117 @@
+"""Batch requests to run multiple sub-requests in one HTTP call."""
+
+from base64 import b64encode
+from inspect import unwrap
+
+from flask import current_app, request
+from werkzeug.exceptions import HTTPException
+from werkzeug.wrappers import Response
+
+from his import authenticated, authorized
+from his.messages import InvalidData
+from wsgilib import JSON
+
+from hievents.wsgi import customer, event, image, price, sub_event, tag
+from hievents.wsgi.routing import read_only, writes
+
+__all__ = ["ROUTES"]
+
+
+MAX_REQUESTS = 50
+ENDPOINTS = frozenset(
+    endpoint
+    for *_, endpoint in (
+        event.ROUTES
+        + customer.ROUTES
+        + image.ROUTES
+        + price.ROUTES
+        + sub_event.ROUTES
+        + tag.ROUTES
+    )
+)
+SKIPPED_HEADERS = frozenset({"Content-Type", "Content-Length"})
+
+
+def _get_sub_requests():
+    """Returns the validated list of sub-requests."""
+
+    sub_requests = request.json
+
+    if not isinstance(sub_requests, list) or len(sub_requests) > MAX_REQUESTS:
+        raise InvalidData(hint=f"Expected a list of at most {MAX_REQUESTS} requests.")
+
+    for sub_request in sub_requests:
+        if not isinstance(sub_request, dict) or "path" not in sub_request:
+            raise InvalidData(hint="Each request needs a path.")
+
+    return sub_requests
+
+
+def _get_body(response):
+    """Returns the response body as a JSON-ish value."""
+
+    if response.is_json:
+        return response.get_json()
+
+    if response.mimetype.startswith("text/"):
+        return response.get_data(as_text=True)
+
+    return b64encode(response.get_data()).decode()
+
+
+def _run(adapter, headers, sub_request):
+    """Runs the sub-request and returns the response."""
+
+    method = sub_request.get("method", "GET").upper()
+    path = sub_request["path"]
+
+    try:
+        endpoint, args = adapter.match(path.partition("?")[0], method=method)
+    except HTTPException as http_exception:
+        return http_exception.get_response()
+
+    if endpoint not in ENDPOINTS:
+        return Response("Not allowed in batch requests.", status=403)
+
+    # Authentication and authorization have been checked for the batch.
+    function = unwrap(current_app.view_functions[endpoint])
+
+    # Unwrapping also removed the routing, so reads go to the replica
+    # and writes keep subsequent reads on the primary.
+    function = read_only(function) if method == "GET" else writes(function)
+
+    with current_app.test_request_context(
+        path, method=method, headers=headers, json=sub_request.get("json")
+    ):
+        try:
+            return function(**args)
+        except HTTPException as http_exception:
+            return http_exception.get_response()
+        except Exception as error:  # Messages are raised as responses.
+            if isinstance(error, Response):
+                return error
+
+            raise
+
+
+@authenticated
+@authorized("hievents")
+def batch():
+    """Runs a list of sub-requests and returns their statuses and bodies."""
+
+    sub_requests = _get_sub_requests()
+    adapter = current_app.url_map.bind_to_environ(request.environ)
+    headers = [
+        (key, value) for key, value in request.headers if key not in SKIPPED_HEADERS
+    ]
+    responses = []
+
+    # Sub-requests share the connection checked out for this request.
+    for sub_request in sub_requests:
+        response = _run(adapter, headers, sub_request)
+        responses.append({"status": response.status_code, "body": _get_body(response)})
+
+    return JSON(responses)
+
+
+ROUTES = (("POST", "/batch", batch, "batch"),)
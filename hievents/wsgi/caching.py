@@ -0,0 +1,76 @@
+"""HTTP caching of binary content and feeds."""
+
+from flask import Response, request, stream_with_context
+
+from wsgilib import Binary
+
+from hievents import cache
+from hievents.database import keep_routing
+from hievents.orm import DATABASE
+
+__all__ = [
+    "IMMUTABLE",
+    "PUBLIC_IMMUTABLE",
+    "REVALIDATE",
+    "PRIVATE_REVALIDATE",
+    "not_modified",
+    "cached_binary",
+    "cached_stream",
+]
+
+
+IMMUTABLE = "private, max-age=31536000, immutable"
+PUBLIC_IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, no-cache"
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def not_modified(etag, cache_control=REVALIDATE):
+    """Returns a 304 response if the client's copy
+    matches the ETag, otherwise None.
+    """
+
+    if not request.if_none_match.contains(etag):
+        return None
+
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+
+def cached_binary(bytes_, etag, cache_control=REVALIDATE):
+    """Returns a binary response with an ETag, caching
+    headers and support for conditional and range requests.
+    """
+
+    response = Binary(bytes_)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    return response.make_conditional(
+        request, accept_ranges=True, complete_length=len(bytes_)
+    )
+
+
+def cached_stream(etag, mimetype, chunks, cache_control=REVALIDATE, coalesce=False):
+    """Returns a feed with an ETag from the file system cache.
+
+    On a cache miss, the chunks are streamed to the client
+    and written to the cache at the same time. If coalescing,
+    the first miss stores the entry and all misses serve it.
+    """
+
+    if (response := not_modified(etag, cache_control)) is not None:
+        return response
+
+    if (bytes_ := cache.load(etag)) is not None:
+        response = Response(bytes_, mimetype=mimetype)
+    else:
+        # The chunks are rendered after the handler has returned.
+        chunks = keep_routing(DATABASE, chunks)
+        chunks = (cache.stream if coalesce else cache.tee)(etag, chunks)
+        response = Response(stream_with_context(chunks), mimetype=mimetype)
+
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    return response
@@ -2,23 +2,33 @@
 
 from hinews.messages.customer import NoSuchCustomer, CustomerDeleted
 from his import authenticated, authorized
+from mdb import Company, Customer
 from wsgilib import JSON
 
 from hievents.orm import CustomerList, EventCustomer
+from hievents.wsgi.responses import FastJSON
+from hievents.wsgi.routing import read_only, writes
 
 __all__ = ["ROUTES"]
 
 
 @authenticated
 @authorized("hievents")
+@read_only
 def list_():
-    """Lists available customers."""
+    """Lists available customers with their companies in one query."""
 
-    return JSON([customer.to_json() for customer in CustomerList])
+    customers = (
+        CustomerList.select(CustomerList, Customer, Company)
+        .join(Customer)
+        .join(Company)
+    )
+    return FastJSON([customer.to_json() for customer in customers])
 
 
 @authenticated
 @authorized("hievents")
+@read_only
 def get(ident):
     """Returns the respective customer."""
 
@@ -32,6 +42,7 @@ def get(ident):
 
 @authenticated
 @authorized("hievents")
+@writes
 def delete(ident):
     """Deletes the respective customer."""
 
@@ -13,18 +13,41 @@ from his.messages import MissingData, InvalidData
 from peeweeplus import FieldValueError, FieldNotNullable
 from wsgilib import JSON
 
+from hievents.feeds import csv, fingerprint
+from hievents.jobs import enqueue_feed_rebuilds, enqueue_watermark
 from hievents.messages.event import (
     NoSuchEvent,
     EventCreated,
     EventDeleted,
     EventPatched,
 )
-from hievents.messages.sub_event import SubEventCreated
-from hievents.orm import Event, Editor, Image, EventCustomer, Tag, SubEvent
+from hievents.messages.price import NoSuchPrice
+from hievents.messages.sub_event import NoSuchSubEvent, SubEventCreated
+from hievents.orm import (
+    DATABASE,
+    Event,
+    Editor,
+    Image,
+    ImageFile,
+    EventCustomer,
+    Tag,
+    SubEvent,
+    Price,
+    PriceSummary,
+    json_rows,
+)
+from hievents.wsgi.caching import PRIVATE_REVALIDATE, cached_stream
+from hievents.wsgi.functions import list_events
+from hievents.wsgi.responses import FastJSON
+from hievents.wsgi.routing import read_only, writes
 
 __all__ = ["_get_event", "ROUTES"]
 
 
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
 def _get_event(ident):
     """Returns the respective event."""
 
@@ -37,37 +60,54 @@ def _get_event(ident):
 def _get_images(event):
     """Yields the event's images."""
 
-    return Image.select().where(Image.event == event)
+    return Image.select(cascade=True).where(Image.event == event)
 
 
 def _get_event_customers(event):
     """Yields the event's customers."""
 
-    return EventCustomer.select().where(EventCustomer.event == event)
+    return EventCustomer.select(EventCustomer.id, EventCustomer.customer).where(
+        EventCustomer.event == event
+    )
 
 
 def _get_tags(event):
     """Yields tags of the respective event."""
 
-    return Tag.select().where(Tag.event == event)
+    return Tag.select(Tag.id, Tag.event, Tag.tag).where(Tag.event == event)
 
 
 def _get_sub_events(event):
     """Yields the event's sub events."""
 
-    return SubEvent.select().where(SubEvent.event == event)
+    return SubEvent.select(
+        SubEvent.id, SubEvent.event, SubEvent.timestamp, SubEvent.caption
+    ).where(SubEvent.event == event)
 
 
 @authenticated
 @authorized("hievents")
+@read_only
 def list_():
-    """Lists all available events."""
+    """Lists the events filtered by the request parameters."""
+
+    return list_events(Event.select(cascade=True))
 
-    return JSON([event.to_json() for event in Event])
+
+@authenticated
+@authorized("hievents")
+@read_only
+def export_csv():
+    """Returns all events as a CSV feed."""
+
+    events = Event.select(cascade=True)
+    etag = fingerprint("csv", events)
+    return cached_stream(etag, "text/csv", csv(events), PRIVATE_REVALIDATE)
 
 
 @authenticated
 @authorized("hievents")
+@read_only
 def get(ident):
     """Returns a specific event."""
 
@@ -76,6 +116,7 @@ def get(ident):
 
 @authenticated
 @authorized("hievents")
+@writes
 def post():
     """Adds a new event."""
 
@@ -92,15 +133,19 @@ def post():
 
 @authenticated
 @authorized("hievents")
+@writes
 def delete(ident):
     """Adds a new event."""
 
-    _get_event(ident).delete_instance()
+    event = _get_event(ident)
+    enqueue_feed_rebuilds(event)
+    event.delete_instance()
     return EventDeleted()
 
 
 @authenticated
 @authorized("hievents")
+@writes
 def patch(ident):
     """Adds a new event."""
 
@@ -109,19 +154,88 @@ def patch(ident):
     event.save()
     editor = Editor.add(event, ACCOUNT)
     editor.save()
+    enqueue_feed_rebuilds(event)
     return EventPatched()
 
 
+def _get_patches(key):
+    """Returns the list of partial updates of the respective key."""
+
+    patches = (request.json or {}).get(key, [])
+
+    if not isinstance(patches, list) or not all(
+        isinstance(patch, dict) for patch in patches
+    ):
+        raise InvalidData(hint=f'"{key}" must be a list of objects.')
+
+    return patches
+
+
 @authenticated
 @authorized("hievents")
+@writes
+def patch_bulk(ident):
+    """Patches multiple sub-events and prices of the event in one transaction.
+
+    Expects {"sub_events": [{"id": …, …}, …], "prices": [{"id": …, …}, …]}.
+    """
+
+    event = _get_event(ident)
+    sub_events = _get_patches("sub_events")
+    prices = _get_patches("prices")
+
+    try:
+        with DATABASE.atomic():
+            try:
+                SubEvent.bulk_patch(event, sub_events)
+            except SubEvent.DoesNotExist:
+                raise NoSuchSubEvent() from None
+
+            try:
+                Price.bulk_patch(event, prices)
+            except Price.DoesNotExist:
+                raise NoSuchPrice() from None
+
+            if prices:
+                PriceSummary.refresh(event.id)
+
+            # Saving the editor bumps the event's revision once for all patches.
+            Editor.add(event, ACCOUNT).save()
+    except FieldNotNullable as field_not_nullable:
+        raise MissingData(**field_not_nullable.to_json())
+    except FieldValueError as field_value_error:
+        raise InvalidData(**field_value_error.to_json())
+
+    enqueue_feed_rebuilds(event)
+    return EventPatched()
+
+
+@authenticated
+@authorized("hievents")
+@read_only
+def list_editors(ident):
+    """Lists a page of editors of the respective event, latest first."""
+
+    page = max(request.args.get("page", 1, type=int), 1)
+    size = request.args.get("size", PAGE_SIZE, type=int)
+    size = min(max(size, 1), MAX_PAGE_SIZE)
+    editors = _get_event(ident).editors.paginate(page, size)
+    return FastJSON([editor.to_json() for editor in editors])
+
+
+@authenticated
+@authorized("hievents")
+@read_only
 def list_images(ident):
     """Lists all images of the respective event."""
 
-    return JSON([image.to_json() for image in _get_images(_get_event(ident))])
+    images = _get_images(_get_event(ident)).iterator()
+    return FastJSON([image.to_json() for image in images])
 
 
 @authenticated
 @authorized("hievents")
+@writes
 def post_image(ident):
     """Adds a new image to the respective event."""
 
@@ -146,32 +260,31 @@ def post_image(ident):
     metadata = loads(metadata.decode())
 
     try:
-        image = Image.add(event, image, metadata, ACCOUNT)
+        # Acquire the file before the transaction, see ImageFile.acquire().
+        with ImageFile.acquired(image) as image_file, DATABASE.atomic():
+            image = Image.add(event, image_file, metadata, ACCOUNT)
+            image.save()
     except KeyError as key_error:
         raise MissingData(key=key_error.args[0])
     except ValueError as value_error:
         raise InvalidData(hint=value_error.args[0])
 
-    image.file.save()
-    image.save()
+    enqueue_watermark(image)
     return ImageAdded(id=image.id)
 
 
 @authenticated
 @authorized("hievents")
+@read_only
 def list_customers(ident):
     """Lists customers of the respective event."""
 
-    return JSON(
-        [
-            event_customer.to_json()
-            for event_customer in _get_event_customers(_get_event(ident))
-        ]
-    )
+    return FastJSON(json_rows(_get_event_customers(_get_event(ident))))
 
 
 @authenticated
 @authorized("hievents")
+@writes
 def post_customer(ident):
     """Adds a customer to the respective event."""
 
@@ -183,19 +296,22 @@ def post_customer(ident):
         raise NoSuchCustomer()
 
     customer.save()
+    enqueue_feed_rebuilds(event)
     return CustomerAdded()
 
 
 @authenticated
 @authorized("hievents")
+@read_only
 def list_tags(ident):
     """Lists tags of the respective event."""
 
-    return JSON([tag.to_json() for tag in _get_tags(_get_event(ident))])
+    return FastJSON(json_rows(_get_tags(_get_event(ident))))
 
 
 @authenticated
 @authorized("hievents")
+@writes
 def post_tag(ident):
     """Adds a tag to the respective event."""
 
@@ -212,32 +328,37 @@ def post_tag(ident):
 
 @authenticated
 @authorized("hievents")
+@read_only
 def list_sub_events(ident):
     """Adds a tag to the respective event."""
 
-    return JSON(
-        [sub_event.to_json() for sub_event in _get_sub_events(_get_event(ident))]
-    )
+    return FastJSON(json_rows(_get_sub_events(_get_event(ident))))
 
 
 @authenticated
 @authorized("hievents")
+@writes
 def post_sub_event(ident):
     """Adds a tag to the respective event."""
 
     event = _get_event(ident)
     sub_event = SubEvent.from_json(event, request.json)
     sub_event.save()
+    enqueue_feed_rebuilds(event)
     return SubEventCreated()
 
 
 ROUTES = (
     # Events.
     ("GET", "/event", list_, "list_events"),
+    ("GET", "/event.csv", export_csv, "export_events_csv"),
     ("GET", "/event/<int:ident>", get, "_get_event"),
     ("POST", "/event", post, "post_event"),
     ("DELETE", "/event/<int:ident>", delete, "delete_event"),
     ("PATCH", "/event/<int:ident>", patch, "patch_event"),
+    ("PATCH", "/event/<int:ident>/bulk", patch_bulk, "patch_event_bulk"),
+    # Event editors.
+    ("GET", "/event/<int:ident>/editors", list_editors, "list_event_editors"),
     # Event images.
     ("GET", "/event/<int:ident>/images", list_images, "list_event_images"),
     ("POST", "/event/<int:ident>/images", post_image, "post_event_image"),
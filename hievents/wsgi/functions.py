@@ -0,0 +1,129 @@
+"""Common functions for request handlers."""
+
+from decimal import Decimal, InvalidOperation
+from functools import reduce
+from operator import and_
+
+from flask import request
+
+from his.messages import InvalidData
+
+from hievents.geo import nearby
+from hievents.orm import events_to_json, Currency, Event, PriceSummary
+from hievents.wsgi.responses import FastJSON
+
+__all__ = [
+    "FILTERS",
+    "get_ids",
+    "by_ids",
+    "filter_by_price",
+    "get_location",
+    "list_events",
+]
+
+
+FILTERS = frozenset({"ids", "max_price", "currency", "near", "radius"})
+RADIUS = 10.0  # km
+
+
+def get_ids():
+    """Returns the record IDs of a multi-get request or None."""
+
+    try:
+        ids = request.args["ids"]
+    except KeyError:
+        return None
+
+    try:
+        return [int(ident) for ident in ids.split(",") if ident]
+    except ValueError:
+        raise InvalidData(hint="ids") from None
+
+
+def by_ids(ids, records):
+    """Maps each requested ID to its record's
+    JSON-ish dictionary or None if not found.
+    """
+
+    records = {record["id"]: record for record in records}
+    return {str(ident): records.get(ident) for ident in ids}
+
+
+def filter_by_price(events):
+    """Filters the events by the "max_price" and "currency" parameters.
+
+    The filter runs on the indexed price summaries.
+    """
+
+    conditions = []
+
+    if (max_price := request.args.get("max_price")) is not None:
+        try:
+            conditions.append(PriceSummary.minimum <= Decimal(max_price))
+        except InvalidOperation:
+            raise InvalidData(hint="max_price") from None
+
+    if (currency := request.args.get("currency")) is not None:
+        try:
+            conditions.append(PriceSummary.currency == Currency[currency])
+        except KeyError:
+            raise InvalidData(hint="currency") from None
+
+    if not conditions:
+        return events
+
+    return events.where(
+        Event.id.in_(
+            PriceSummary.select(PriceSummary.event).where(reduce(and_, conditions))
+        )
+    )
+
+
+def get_location():
+    """Returns latitude, longitude and radius of the
+    "near" and "radius" parameters or None.
+    """
+
+    try:
+        near = request.args["near"]
+    except KeyError:
+        return None
+
+    try:
+        latitude, longitude = map(float, near.split(","))
+    except ValueError:
+        raise InvalidData(hint="near") from None
+
+    try:
+        radius = float(request.args.get("radius", RADIUS))
+    except ValueError:
+        raise InvalidData(hint="radius") from None
+
+    return latitude, longitude, radius
+
+
+def list_events(events):
+    """Lists the events filtered by the request parameters.
+
+    Supports multi-get by "ids", price filters and
+    proximity search, which sorts the events by distance.
+    """
+
+    events = filter_by_price(events)
+
+    if (ids := get_ids()) is not None:
+        events = events.where(Event.id.in_(ids))
+
+    if (location := get_location()) is None:
+        json = events_to_json(events)
+    else:
+        nearby_events = nearby(events, *location)
+        json = events_to_json(event for event, _ in nearby_events)
+
+        for dictionary, (_, distance) in zip(json, nearby_events):
+            dictionary["distance"] = distance
+
+    if ids is None:
+        return FastJSON(json)
+
+    return FastJSON(by_ids(ids, json))
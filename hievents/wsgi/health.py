@@ -0,0 +1,20 @@
+"""Health check for load balancers and monitoring."""
+
+from wsgilib import JSON
+
+from hievents.database import check_health
+from hievents.orm import DATABASE
+
+__all__ = ["ROUTES"]
+
+
+def health():
+    """Reports whether the database is reachable."""
+
+    if check_health(DATABASE):
+        return JSON({"database": True})
+
+    return JSON({"database": False}, status=503)
+
+
+ROUTES = (("GET", "/health", health, "health"),)
@@ -4,9 +4,13 @@ from flask import request
 
 from hinews.messages.image import NoSuchImage, ImageDeleted, ImagePatched
 from his import authenticated, authorized
-from wsgilib import Binary, JSON
 
+from hievents.jobs import enqueue_feed_rebuilds, enqueue_watermark
 from hievents.orm import Image
+from hievents.wsgi.caching import IMMUTABLE, not_modified, cached_binary
+from hievents.wsgi.functions import get_ids, by_ids
+from hievents.wsgi.responses import FastJSON
+from hievents.wsgi.routing import read_only, writes
 
 __all__ = ["ROUTES"]
 
@@ -22,37 +26,65 @@ def get_image(ident):
 
 @authenticated
 @authorized("hievents")
+@read_only
 def list_all():
-    """Lists all available images."""
+    """Lists all available images or the images
+    of the IDs given in the "ids" parameter.
 
-    return JSON([image.to_json() for image in Image])
+    File contents are never loaded.
+    """
+
+    images = Image.select(cascade=True)
+
+    if (ids := get_ids()) is None:
+        return FastJSON([image.to_json() for image in images.iterator()])
+
+    images = images.where(Image.id.in_(ids))
+    return FastJSON(by_ids(ids, [image.to_json() for image in images.iterator()]))
 
 
 @authenticated
 @authorized("hievents")
+@read_only
 def get(ident):
-    """Returns a specific image."""
+    """Returns a specific image.
+
+    An image's file cannot be replaced, so its
+    content is cacheable for an unlimited time.
+    """
 
-    return Binary(get_image(ident).data)
+    image = get_image(ident)
+    etag = image.sha256sum
+
+    if (response := not_modified(etag, IMMUTABLE)) is not None:
+        return response
+
+    return cached_binary(image.file.bytes, etag, IMMUTABLE)
 
 
 @authenticated
 @authorized("hievents")
+@writes
 def delete(ident):
     """Deletes the respective image."""
 
-    get_image(ident).delete_instance()
+    image = get_image(ident)
+    image.delete_instance()
+    enqueue_feed_rebuilds(image.event_id)
     return ImageDeleted()
 
 
 @authenticated
 @authorized("hievents")
+@writes
 def patch(ident):
     """Modifies image meta data."""
 
     image = get_image(ident)
     image.patch_json(request.json)
     image.save()
+    enqueue_watermark(image)
+    enqueue_feed_rebuilds(image.event_id)
     return ImagePatched()
 
 
@@ -0,0 +1,50 @@
+"""Observation of background jobs."""
+
+from peewee import fn
+
+from his import authenticated, authorized
+
+from hievents.orm import Job, JobState
+from hievents.wsgi.responses import FastJSON
+from hievents.wsgi.routing import read_only
+
+__all__ = ["ROUTES"]
+
+
+FAILED_JOBS = 20
+
+
+@authenticated
+@authorized("hievents")
+@read_only
+def list_():
+    """Returns job counts per name and state and the latest failed jobs."""
+
+    counts = {}
+
+    for name, state, count in (
+        Job.select(Job.name, Job.state, fn.COUNT(Job.id))
+        .group_by(Job.name, Job.state)
+        .tuples()
+    ):
+        counts.setdefault(name, {})[state.value] = count
+
+    failed = (
+        Job.select()
+        .where(Job.state == JobState.FAILED)
+        .order_by(Job.finished.desc())
+        .limit(FAILED_JOBS)
+    )
+    oldest_pending = (
+        Job.select(fn.MIN(Job.run_after)).where(Job.state == JobState.PENDING).scalar()
+    )
+    return FastJSON(
+        {
+            "counts": counts,
+            "oldest_pending": oldest_pending,
+            "failed": [job.to_json() for job in failed],
+        }
+    )
+
+
+ROUTES = (("GET", "/job", list_, "list_jobs"),)
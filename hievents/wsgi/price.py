@@ -4,18 +4,29 @@ from flask import request
 
 from wsgilib import JSON
 
+from hievents.jobs import enqueue_feed_rebuilds
 from hievents.messages.price import NoSuchPrice, PriceDeleted, PricePatched
-from hievents.orm import Price
+from hievents.orm import Price, json_rows
+from hievents.wsgi.responses import FastJSON
+from hievents.wsgi.routing import read_only
 
 __all__ = ["ROUTES"]
 
 
+@read_only(sticky=False)
 def list_():
     """Lists prices of the respective event."""
 
-    return JSON([price.to_json() for price in Price])
+    return FastJSON(
+        json_rows(
+            Price.select(
+                Price.id, Price.event, Price.value, Price.currency, Price.caption
+            )
+        )
+    )
 
 
+@read_only(sticky=False)
 def get(ident):
     """Returns the respective price."""
 
@@ -36,6 +47,7 @@ def delete(ident):
         raise NoSuchPrice()
 
     price.delete_instance()
+    enqueue_feed_rebuilds(price.event_id)
     return PriceDeleted()
 
 
@@ -48,6 +60,8 @@ def patch(ident):
         raise NoSuchPrice()
 
     price.patch_json(request.json)
+    price.save()
+    enqueue_feed_rebuilds(price.event_id)
     return PricePatched()
 
 
@@ -0,0 +1,101 @@
+"""Opt-in per-request profiling for administrators."""
+
+from cProfile import Profile
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from threading import Lock
+from uuid import uuid4
+
+from flask import request
+
+from his import ACCOUNT
+
+from hievents.config import get_config
+
+__all__ = ["DIRECTORY", "HEADER", "init"]
+
+
+ENABLED = get_config().getboolean("profiling", "enabled", fallback=False)
+DIRECTORY = Path(
+    get_config().get("profiling", "directory", fallback="/var/tmp/hievents")
+)
+HEADER = "X-Profile"
+PROFILER = "hievents.profiler"
+# Only one profiler can be active per process.
+LOCK = Lock()
+
+
+def start():
+    """Starts profiling if a root account requests it."""
+
+    if HEADER not in request.headers:
+        return
+
+    try:
+        root = ACCOUNT.root
+    except Exception:  # pylint: disable=W0703
+        return  # No valid session, e.g. on public requests.
+
+    if not root:
+        return
+
+    if not LOCK.acquire(blocking=False):
+        return
+
+    profiler = request.environ[PROFILER] = Profile()
+    profiler.enable()
+
+
+def _finish(profiler, name):
+    """Stops the profiler and stores the profile as a pstats file."""
+
+    try:
+        profiler.disable()
+    finally:
+        LOCK.release()
+
+    DIRECTORY.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(DIRECTORY / name)
+
+
+def stop(response):
+    """Stops profiling and names the profile in the response.
+
+    Streamed response bodies are rendered after this,
+    so they are profiled until the response is closed.
+    """
+
+    if (profiler := request.environ.pop(PROFILER, None)) is None:
+        return response
+
+    timestamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+    name = f"{timestamp}-{request.endpoint}-{uuid4().hex[:8]}.pstats"
+    response.headers["X-Profile-File"] = name
+
+    if response.is_streamed:
+        response.call_on_close(partial(_finish, profiler, name))
+    else:
+        _finish(profiler, name)
+
+    return response
+
+
+def discard(_):
+    """Stops profiling of requests that failed before stop()."""
+
+    if (profiler := request.environ.pop(PROFILER, None)) is not None:
+        profiler.disable()
+        LOCK.release()
+
+
+def init(application):
+    """Registers the profiling hooks if profiling is enabled.
+
+    If it is disabled, requests do not pass through any hooks.
+    """
+
+    if ENABLED:
+        application.before_request(start)
+        application.after_request(stop)
+        application.teardown_request(discard)
@@ -1,14 +1,24 @@
 """Public customer interface without
 HIS authentication or authorization.
 """
-from flask import request
+from flask import redirect, request
 
 from hinews.messages.image import NoSuchImage
 from hinews.messages.public import MissingAccessToken, InvalidAccessToken
-from wsgilib import JSON, Binary
 
+from hievents.feeds import customer_feed
+from hievents.images import watermarked
 from hievents.messages.event import NoSuchEvent
-from hievents.orm import event_active, Event, Image, AccessToken
+from hievents.orm import customer_events, event_active, Event, Image, AccessToken
+from hievents.wsgi.caching import (
+    PUBLIC_IMMUTABLE,
+    not_modified,
+    cached_binary,
+    cached_stream,
+)
+from hievents.wsgi.functions import FILTERS, list_events
+from hievents.wsgi.responses import FastJSON
+from hievents.wsgi.routing import read_only
 
 __all__ = ["ROUTES"]
 
@@ -29,20 +39,6 @@ def _get_customer():
     return access_token.customer
 
 
-def _active_events():
-    """Yields active events."""
-
-    return Event.select().where(event_active())
-
-
-def _get_events(customer):
-    """Yields events of the querying customer."""
-
-    for event in _active_events():
-        if customer in event.customers:
-            yield event
-
-
 def _get_event(ident):
     """Returns the respective event of the querying customer."""
 
@@ -71,29 +67,86 @@ def _get_image(ident):
     raise NoSuchEvent()
 
 
+@read_only(sticky=False)
 def list_():
-    """Lists the respective events."""
+    """Lists the customer's events filtered by the request parameters.
+
+    The unfiltered listing is served from the feed cache,
+    rendered once for concurrent requests after changes.
+    """
+
+    customer = _get_customer()
+
+    if FILTERS.isdisjoint(request.args):
+        etag, chunks = customer_feed("json", customer)
+        return cached_stream(etag, "application/json", chunks, coalesce=True)
+
+    return list_events(customer_events(customer))
+
+
+@read_only(sticky=False)
+def get_icalendar():
+    """Returns the customer's events as an iCalendar feed."""
 
-    return JSON([event.to_json() for event in _get_events(_get_customer())])
+    etag, chunks = customer_feed("ics", _get_customer())
+    return cached_stream(etag, "text/calendar", chunks, coalesce=True)
 
 
+@read_only(sticky=False)
 def get_event(ident):
     """Returns the respective event."""
 
-    return JSON(_get_event(ident).to_json())
+    return FastJSON(_get_event(ident).to_json())
 
 
+@read_only(sticky=False)
 def get_image(ident):
-    """Returns the respective image."""
+    """Returns the respective image.
 
-    try:
-        return Binary(_get_image(ident).watermarked)
-    except OSError:  # Not an image.
-        return Binary(_get_image(ident).data)
+    The watermark depends on the image's source,
+    which may be patched, so clients must revalidate.
+    """
+
+    image = _get_image(ident)
+    etag = image.watermark_etag
+
+    if (response := not_modified(etag)) is not None:
+        return response
+
+    return cached_binary(watermarked(image, etag), etag)
+
+
+@read_only(sticky=False)
+def get_image_version(ident, version):
+    """Returns the respective version of the image.
+
+    Events list the current versions of their images. Versions
+    never change, so shared caches may store them indefinitely.
+    Outdated versions are redirected to the current one.
+    """
+
+    image = _get_image(ident)
+    etag = image.watermark_etag
+
+    if version != etag:
+        query = request.query_string.decode()
+        return redirect(f"{request.script_root}/pub/image/{ident}/{etag}?{query}")
+
+    if (response := not_modified(etag, PUBLIC_IMMUTABLE)) is not None:
+        return response
+
+    return cached_binary(watermarked(image, etag), etag, PUBLIC_IMMUTABLE)
 
 
 ROUTES = (
     ("GET", "/pub/event", list_, "list_customer_events"),
+    ("GET", "/pub/event.ics", get_icalendar, "get_customer_icalendar"),
     ("GET", "/pub/event/<int:ident>", get_event, "get_customer_event"),
     ("GET", "/pub/image/<int:ident>", get_image, "get_customer_image"),
+    (
+        "GET",
+        "/pub/image/<int:ident>/<version>",
+        get_image_version,
+        "get_customer_image_version",
+    ),
 )
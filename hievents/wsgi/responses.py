@@ -0,0 +1,14 @@
+"""Custom responses."""
+
+from flask import Response
+
+from hievents.encoding import dumps
+
+__all__ = ["FastJSON"]
+
+
+class FastJSON(Response):
+    """A JSON response encoded by hievents.encoding.dumps()."""
+
+    def __init__(self, json, status=200):
+        super().__init__(dumps(json), status=status, mimetype="application/json")
@@ -0,0 +1,76 @@
+"""Routing of read-only handlers to the read replica."""
+
+from functools import partial, wraps
+from pathlib import Path
+from time import time
+
+from his import ACCOUNT
+
+from hievents.config import get_config
+from hievents.database import use_replica
+from hievents.orm import DATABASE
+
+__all__ = ["read_only", "writes"]
+
+
+STATE_DIR = Path(get_config().get("replica", "state_dir", fallback="/run/hievents"))
+STICKY = get_config().getint("replica", "sticky", fallback=10)
+
+
+def _get_marker(account):
+    """Returns the marker file of the account's last write.
+
+    A file's mtime is shared by all worker processes on the host.
+    """
+
+    return STATE_DIR / f"write-{account.id}"
+
+
+def _wrote_recently(account):
+    """Checks whether the account wrote within the sticky window."""
+
+    try:
+        return time() - _get_marker(account).stat().st_mtime < STICKY
+    except FileNotFoundError:
+        return False
+
+
+def _record_write(account):
+    """Records a write of the account."""
+
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    _get_marker(account).touch()
+
+
+def read_only(function=None, *, sticky=True):
+    """Runs the handler on the read replica.
+
+    If sticky, handlers of accounts that have written within
+    the sticky window stay on the primary to read their writes.
+    """
+
+    if function is None:
+        return partial(read_only, sticky=sticky)
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if sticky and _wrote_recently(ACCOUNT):
+            return function(*args, **kwargs)
+
+        with use_replica(DATABASE):
+            return function(*args, **kwargs)
+
+    return wrapper
+
+
+def writes(function):
+    """Records writes of the current account for read-your-writes stickiness."""
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _record_write(ACCOUNT)
+
+    return wrapper
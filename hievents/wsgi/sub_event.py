@@ -4,8 +4,11 @@ from flask import request
 
 from wsgilib import JSON
 
+from hievents.jobs import enqueue_feed_rebuilds
 from hievents.messages.sub_event import NoSuchSubEvent, SubEventDeleted, SubEventPatched
-from hievents.orm import SubEvent
+from hievents.orm import SubEvent, json_rows
+from hievents.wsgi.responses import FastJSON
+from hievents.wsgi.routing import read_only
 
 __all__ = ["ROUTES"]
 
@@ -19,12 +22,20 @@ def get_sub_event(event, ident):
         raise NoSuchSubEvent()
 
 
+@read_only(sticky=False)
 def list_():
     """List sub events of a certain event."""
 
-    return JSON([sub_event.to_json() for sub_event in SubEvent])
+    return FastJSON(
+        json_rows(
+            SubEvent.select(
+                SubEvent.id, SubEvent.event, SubEvent.timestamp, SubEvent.caption
+            )
+        )
+    )
 
 
+@read_only(sticky=False)
 def get(ident):
     """Returns the respective sub event."""
 
@@ -45,6 +56,7 @@ def delete(ident):
         raise NoSuchSubEvent()
 
     sub_event.delete_instance()
+    enqueue_feed_rebuilds(sub_event.event_id)
     return SubEventDeleted()
 
 
@@ -58,6 +70,7 @@ def patch(ident):
 
     sub_event.patch_json(request.json)
     sub_event.save()
+    enqueue_feed_rebuilds(sub_event.event_id)
     return SubEventPatched()
 
 
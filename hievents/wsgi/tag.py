@@ -5,20 +5,24 @@ from his import authenticated, authorized
 from wsgilib import JSON
 
 from hievents.orm import TagList, Tag
+from hievents.wsgi.responses import FastJSON
+from hievents.wsgi.routing import read_only, writes
 
 __all__ = ["ROUTES"]
 
 
 @authenticated
 @authorized("hievents")
+@read_only
 def list_():
     """Lists available tags."""
 
-    return JSON([tag.tag for tag in TagList])
+    return FastJSON([tag for tag, in TagList.select(TagList.tag).tuples()])
 
 
 @authenticated
 @authorized("hievents")
+@read_only
 def get(ident):
     """Returns the respective tag."""
 
@@ -32,6 +36,7 @@ def get(ident):
 
 @authenticated
 @authorized("hievents")
+@writes
 def delete(ident):
     """Deletes the respective tag."""
 
@@ -12,5 +12,12 @@ setup(
     maintainer_email="<r dot neumann at homeinfo period de>",
     requires=["his"],
     packages=["hievents", "hievents.messages", "hievents.wsgi"],
+    scripts=[
+        "files/hievents-archive",
+        "files/hievents-migrate",
+        "files/hievents-purge-cache",
+        "files/hievents-warmup",
+        "files/hievents-worker",
+    ],
     description="HOMEINFO events API.",
 )